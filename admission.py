@@ -0,0 +1,204 @@
+"""コストベースのアドミッション制御（負荷制限）
+
+Flask-Limiter はIPごとのリクエスト数しか見ないため、100ページの結合も
+ページ数取得も同じ1回として数えてしまう。ここではリクエストごとにコストを
+見積もり、全ワーカー合計の処理中コストが上限を超える場合は少し待ってから
+503 + Retry-After を返す。
+
+ワーカー間の共有には状態ディレクトリ内のファイルを使う（1リクエスト1ファイル、
+ファイル名にワーカーのPIDを含める）。タイムアウトで強制終了されたワーカーの分は
+PIDが存在しなくなった時点で自動的に除外される。
+"""
+import fcntl
+import math
+import os
+import time
+import uuid
+from functools import wraps
+
+from flask import g, jsonify, request
+
+import pdfcutter_core
+from pdf_engine import engine_for
+
+# 操作ごとの固定コストと1ページあたりのコスト
+BASE_COST = {
+    'info': 1,
+    'split': 5,
+    'merge': 5,
+    'delete': 3,
+    'extract': 3,
+    'reorder': 3,
+    'compress': 5,
+}
+PAGE_COST = {
+    'info': 0,
+    'split': 1.0,  # ページごとに出力ファイルを書くため重い
+    'merge': 1.0,
+    'delete': 0.5,
+    'extract': 0.5,
+    'reorder': 0.5,
+    'compress': 2.0,  # 画像のデコード・縮小・再エンコードを含む
+}
+FILE_COST = 1
+MB_COST = 2
+
+# ページ数が読めなかった場合に1MBあたり何ページとみなすか
+PAGES_PER_MB = 20
+
+POLL_INTERVAL = 0.2
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AdmissionController:
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('ADMISSION_ENABLED', True)
+        self.max_cost = app.config.get('ADMISSION_MAX_COST', 200)
+        self.queue_timeout = app.config.get('ADMISSION_QUEUE_TIMEOUT', 5)
+        self.retry_after = app.config.get('ADMISSION_RETRY_AFTER', 5)
+        self.state_dir = app.config['ADMISSION_STATE_DIR']
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.lock_path = os.path.join(self.state_dir, '.lock')
+
+    # --- コスト見積もり -------------------------------------------------
+
+    def _count_pages(self, file):
+        """アップロードされたPDFのページ数を事前に読む（失敗時は None）"""
+        try:
+            return pdfcutter_core.get_page_count(file.stream, engine=engine_for('info', self.app.config))
+        except Exception:
+            return None
+        finally:
+            file.stream.seek(0)
+
+    def estimate_cost(self, operation):
+        """Content-Length・ファイル数・ページ数から処理コストを見積もる"""
+        content_length = request.content_length or 0
+        megabytes = content_length / (1024 * 1024)
+
+        files = [f for f in request.files.getlist('file') + request.files.getlist('files[]') if f.filename]
+        cost = BASE_COST.get(operation, 1) + FILE_COST * len(files) + MB_COST * megabytes
+
+        page_cost = PAGE_COST.get(operation, 1.0)
+        if page_cost:
+            pages = 0
+            # 読めたページ数はプロファイラーでも使う（同じPDFを何度も解析しない）
+            g.upload_pages = []
+            for file in files:
+                counted = self._count_pages(file)
+                g.upload_pages.append(counted)
+                if counted is None:
+                    counted = math.ceil(megabytes / max(len(files), 1) * PAGES_PER_MB)
+                pages += counted
+            cost += page_cost * pages
+            # 結合・抽出の後処理として画像圧縮を行う場合はその分も加える
+            if operation != 'compress' and request.form.get('compress') == 'true':
+                cost += PAGE_COST['compress'] * pages
+
+        return cost
+
+    # --- 処理中コストの管理 ---------------------------------------------
+
+    def _entries(self):
+        """処理中リクエストの (パス, コスト) を返し、終了済みワーカーの分を削除する"""
+        entries = []
+        for name in os.listdir(self.state_dir):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(self.state_dir, name)
+            try:
+                pid = int(name.split('-', 1)[0])
+                if not _pid_alive(pid):
+                    os.remove(path)
+                    continue
+                with open(path, 'r') as f:
+                    entries.append((path, float(f.read() or 0)))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def in_flight(self):
+        """全ワーカー合計の処理中コスト"""
+        return sum(cost for _, cost in self._entries())
+
+    def try_acquire(self, cost):
+        """予算内なら登録してトークン（ファイルパス）を返す。超える場合は None"""
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                current = sum(c for _, c in self._entries())
+                # 単独で予算を超えるリクエストも、他に処理中が無ければ受け付ける
+                if current > 0 and current + cost > self.max_cost:
+                    return None
+                token = os.path.join(self.state_dir, f"{os.getpid()}-{uuid.uuid4().hex}")
+                with open(token, 'w') as f:
+                    f.write(str(cost))
+                return token
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def acquire(self, cost):
+        """予算が空くまで最大 queue_timeout 秒待つ"""
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            token = self.try_acquire(cost)
+            if token is not None or time.monotonic() >= deadline:
+                return token
+            time.sleep(POLL_INTERVAL)
+
+    def release(self, token):
+        try:
+            os.remove(token)
+        except OSError:
+            pass
+
+    # --- デコレーター ---------------------------------------------------
+
+    def _reject(self, operation, cost):
+        current = self.in_flight()
+        # 予算超過分が捌けるまでの目安。小さなリクエストでも最低 retry_after 秒は待ってもらう
+        overflow = max(current + cost - self.max_cost, 0)
+        retry_after = max(self.retry_after, math.ceil(self.retry_after * overflow / self.max_cost))
+        self.app.logger.warning(
+            f"アドミッション拒否: {operation} cost={cost:.1f} in_flight={current:.1f} max={self.max_cost}")
+        response = jsonify({
+            'success': False,
+            'error': 'サーバーが混雑しています。しばらくしてから再度お試しください'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def limit(self, operation):
+        """処理コストを見積もってアドミッション制御を行うデコレーター"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                cost = self.estimate_cost(operation)
+                token = self.acquire(cost)
+                if token is None:
+                    return self._reject(operation, cost)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(token)
+            return wrapper
+        return decorator
@@ -6,24 +6,83 @@ from flask import Flask, render_template, request, jsonify, send_file, url_for,
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from werkzeug.utils import secure_filename
-import PyPDF2
 from config import Config
+import assets
+from admission import AdmissionController
+from result_cache import ResultCache
+from profiling import Profiler
+from pdf_engine import engine_for
+import pdfcutter_core
 import traceback
 
 app = Flask(__name__)
 app.config.from_object(Config)
+assets.init_app(app)
 
 # Rate limiting
+def admitted(response):
+    """アドミッション制御で断った（503）リクエストはレート制限の回数に数えない
+
+    フロントエンドは 503 を Retry-After に従って再送するため、数えると1回の操作で
+    制限を使い切ってしまう。
+    """
+    return response.status_code != 503
+
+
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
-    default_limits=["200 per day", "50 per hour"]
+    default_limits=["200 per day", "50 per hour"],
+    default_limits_deduct_when=admitted
 )
 
+# 処理コストに基づく負荷制限（ワーカー間で共有）
+admission = AdmissionController(app)
+
+# 同じ入力・同じ操作の結果を再利用するキャッシュ
+result_cache = ResultCache(app)
+
+# 指定されたリクエストだけ cProfile で計測する
+profiler = Profiler(app)
+
 # アップロードとダウンロードディレクトリの作成
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['DOWNLOAD_FOLDER'], exist_ok=True)
 
+def pdf_engine(operation):
+    """操作に対応するPDFエンジンを取得"""
+    return engine_for(operation, app.config)
+
+def form_int(name, default, minimum, maximum):
+    """フォームの整数値を取得（不正な値は既定値、範囲外は丸める）"""
+    try:
+        value = int(request.form.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return min(max(value, minimum), maximum)
+
+def compression_options():
+    """フォームから画像圧縮の設定を取得"""
+    return {
+        'target_dpi': form_int('target_dpi', app.config['COMPRESS_TARGET_DPI'], 72, 300),
+        'jpeg_quality': form_int('jpeg_quality', app.config['COMPRESS_JPEG_QUALITY'], 30, 95),
+    }
+
+def requested_compression():
+    """結合・抽出で画像圧縮が指定されていれば設定を返す（指定が無ければ None）"""
+    if request.form.get('compress') != 'true':
+        return None
+    return compression_options()
+
+def compress_output(path, options):
+    """出力ファイルの画像を圧縮して上書きする"""
+    return pdfcutter_core.compress_pdf(
+        path, path,
+        max_workers=app.config['COMPRESS_MAX_WORKERS'],
+        max_pages=app.config['MAX_PAGES_PER_PDF'],
+        **options
+    )
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() == 'pdf'
 
@@ -47,6 +106,10 @@ def reorder():
 def extract():
     return render_template('extract.html')
 
+@app.route('/compress')
+def compress():
+    return render_template('compress.html')
+
 @app.route('/terms')
 def terms():
     return render_template('terms.html')
@@ -90,36 +153,13 @@ def sitemap_xml():
 </urlset>"""
         return Response(sitemap_content, mimetype='application/xml')
 
-def parse_page_specification(page_spec, total_pages):
-    """ページ指定文字列を解析してページ番号のリストを返す"""
-    if not page_spec.strip():
-        return []
-    
-    pages = set()
-    parts = page_spec.replace(' ', '').split(',')
-    
-    for part in parts:
-        if '-' in part:
-            try:
-                start, end = map(int, part.split('-', 1))
-                start = max(1, min(start, total_pages))
-                end = max(start, min(end, total_pages))
-                pages.update(range(start, end + 1))
-            except ValueError:
-                continue
-        else:
-            try:
-                page = int(part)
-                if 1 <= page <= total_pages:
-                    pages.add(page)
-            except ValueError:
-                continue
-    
-    return sorted(list(pages))
-
 @app.route('/split', methods=['POST'])
-@limiter.limit("10 per minute")
+@limiter.limit("10 per minute", deduct_when=admitted)
+@admission.limit('split')
+@profiler.profile('split')
 def split_pdf():
+    upload_path = None
+    
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'ファイルが選択されていません'})
@@ -134,66 +174,79 @@ def split_pdf():
         upload_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_id}_{filename}")
         file.save(upload_path)
         
-        # PDF読み込み
-        with open(upload_path, 'rb') as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            total_pages = len(reader.pages)
-            
-            if total_pages > app.config['MAX_PAGES_PER_PDF']:
-                os.remove(upload_path)
-                return jsonify({'success': False, 'error': f'ページ数が{app.config["MAX_PAGES_PER_PDF"]}を超えています'})
-            
-            # 分割タイプを取得
-            split_type = request.form.get('split_type', 'all')
-            pages_to_split = []
-            
-            if split_type == 'all':
-                pages_to_split = list(range(1, total_pages + 1))
-            elif split_type == 'range':
-                start_page = int(request.form.get('start_page', 1))
-                end_page = int(request.form.get('end_page', total_pages))
-                start_page = max(1, min(start_page, total_pages))
-                end_page = max(start_page, min(end_page, total_pages))
-                pages_to_split = list(range(start_page, end_page + 1))
-            elif split_type == 'specific':
-                specific_pages = request.form.get('specific_pages', '')
-                pages_to_split = parse_page_specification(specific_pages, total_pages)
-            
-            if not pages_to_split:
-                os.remove(upload_path)
-                return jsonify({'success': False, 'error': '有効なページが指定されていません'})
-            
+        # 分割タイプとパラメータを取得
+        split_type = request.form.get('split_type', 'all')
+        options = {}
+        if split_type == 'range':
+            options['start_page'] = int(request.form.get('start_page', 1))
+            if request.form.get('end_page'):
+                options['end_page'] = int(request.form['end_page'])
+        elif split_type == 'specific':
+            options['specific_pages'] = request.form.get('specific_pages', '').replace(' ', '')
+        elif split_type == 'chunk':
+            options['chunk_size'] = int(request.form.get('chunk_size', 10))
+        elif split_type == 'size':
+            options['max_bytes'] = int(float(request.form.get('max_size_mb', 5)) * 1024 * 1024)
+        
+        base_name = os.path.splitext(filename)[0]
+        
+        def output_name(group):
+            if len(group) == 1:
+                return f"{base_name}_page_{group[0]}.pdf"
+            return f"{base_name}_pages_{group[0]}-{group[-1]}.pdf"
+        
+        def open_output(group):
+            return os.path.join(app.config['DOWNLOAD_FOLDER'], f"{unique_id}_{output_name(group)}")
+        
+        engine = pdf_engine('split')
+        cache_key = result_cache.make_key('split', [upload_path], {
+            'split_type': split_type,
+            'options': options,
+            'engine': engine.name
+        })
+        cached = result_cache.get(cache_key)
+        if cached:
+            # キャッシュ済みの分割結果を配置（配置前に削除されていた場合は分割し直す）
+            outputs = [(group, open_output(group)) for group in cached['groups']]
+            if not result_cache.restore(cache_key, {
+                    f"part_{i}.pdf": output_path for i, (_, output_path) in enumerate(outputs)}):
+                cached = None
+        
+        if not cached:
             # ページ分割実行
-            output_files = []
-            base_name = os.path.splitext(filename)[0]
-            
-            for page_num in pages_to_split:
-                writer = PyPDF2.PdfWriter()
-                writer.add_page(reader.pages[page_num - 1])
-                
-                output_filename = f"{base_name}_page_{page_num}.pdf"
-                output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], f"{unique_id}_{output_filename}")
-                
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
-                
-                output_files.append({
-                    'filename': output_filename,
-                    'page': page_num,
-                    'download_url': url_for('download_file', filename=f"{unique_id}_{output_filename}")
-                })
-        
-        # アップロードファイルを削除
-        os.remove(upload_path)
+            try:
+                outputs = pdfcutter_core.split_pdf(
+                    upload_path, open_output, split_type,
+                    engine=engine,
+                    max_pages=app.config['MAX_PAGES_PER_PDF'],
+                    **options
+                )
+            except pdfcutter_core.PdfOperationError as e:
+                return jsonify({'success': False, 'error': str(e)})
+            
+            result_cache.store(
+                cache_key,
+                {f"part_{i}.pdf": output_path for i, (_, output_path) in enumerate(outputs)},
+                {'groups': [group for group, _ in outputs]}
+            )
+        
+        output_files = []
+        for group, output_path in outputs:
+            output_filename = output_name(group)
+            output_files.append({
+                'filename': output_filename,
+                'page': group[0],
+                'pages': group,
+                'download_url': url_for('download_file', filename=f"{unique_id}_{output_filename}")
+            })
         
         # ZIP作成
         zip_filename = f"{unique_id}_split_files.zip"
         zip_path = os.path.join(app.config['DOWNLOAD_FOLDER'], zip_filename)
         
         with zipfile.ZipFile(zip_path, 'w') as zip_file:
-            for file_info in output_files:
-                file_path = os.path.join(app.config['DOWNLOAD_FOLDER'], f"{unique_id}_{file_info['filename']}")
-                zip_file.write(file_path, file_info['filename'])
+            for file_info, (_, output_path) in zip(output_files, outputs):
+                zip_file.write(output_path, file_info['filename'])
         
         return jsonify({
             'success': True,
@@ -206,10 +259,19 @@ def split_pdf():
         app.logger.error(f"分割エラー: {str(e)}")
         app.logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': 'ファイルの分割中にエラーが発生しました'})
+    
+    finally:
+        # アップロードファイルを削除
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
 
 @app.route('/merge', methods=['POST'])
-@limiter.limit("5 per minute")
+@limiter.limit("5 per minute", deduct_when=admitted)
+@admission.limit('merge')
+@profiler.profile('merge')
 def merge_pdf():
+    temp_files = []
+    
     try:
         files = request.files.getlist('files[]')
         
@@ -225,43 +287,38 @@ def merge_pdf():
                 return jsonify({'success': False, 'error': 'すべてPDFファイルを選択してください'})
         
         unique_id = str(uuid.uuid4())
-        temp_files = []
-        
-        # PDF結合
-        writer = PyPDF2.PdfWriter()
-        total_pages = 0
         
         for file in files:
             filename = secure_filename(file.filename)
             temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_id}_{filename}")
             file.save(temp_path)
             temp_files.append(temp_path)
-            
-            with open(temp_path, 'rb') as pdf_file:
-                reader = PyPDF2.PdfReader(pdf_file)
-                page_count = len(reader.pages)
-                total_pages += page_count
-                
-                if total_pages > app.config['MAX_PAGES_PER_PDF']:
-                    for temp_file in temp_files:
-                        if os.path.exists(temp_file):
-                            os.remove(temp_file)
-                    return jsonify({'success': False, 'error': f'結合後のページ数が{app.config["MAX_PAGES_PER_PDF"]}を超えています'})
-                
-                for page in reader.pages:
-                    writer.add_page(page)
         
-        # 結合ファイルを保存
+        # PDF結合
         output_filename = f"merged_{unique_id}.pdf"
         output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
         
-        with open(output_path, 'wb') as output_file:
-            writer.write(output_file)
-
-        # 一時ファイルを削除
-        for temp_file in temp_files:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+        engine = pdf_engine('merge')
+        compression = requested_compression()
+        cache_key = result_cache.make_key('merge', temp_files, {
+            'engine': engine.name,
+            'compress': compression
+        })
+        
+        if not (result_cache.get(cache_key)
+                and result_cache.restore(cache_key, {'result.pdf': output_path})):
+            try:
+                pdfcutter_core.merge_pdfs(
+                    temp_files, output_path,
+                    engine=engine,
+                    max_pages=app.config['MAX_PAGES_PER_PDF']
+                )
+                if compression:
+                    compress_output(output_path, compression)
+            except pdfcutter_core.PdfOperationError as e:
+                return jsonify({'success': False, 'error': str(e)})
+            
+            result_cache.store(cache_key, {'result.pdf': output_path})
         
         return jsonify({
             'success': True,
@@ -274,9 +331,17 @@ def merge_pdf():
         app.logger.error(f"結合エラー: {str(e)}")
         app.logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': 'ファイルの結合中にエラーが発生しました'})
+    
+    finally:
+        # 一時ファイルを削除
+        for temp_file in temp_files:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
 
 @app.route('/delete-pages', methods=['POST'])
-@limiter.limit("10 per minute")
+@limiter.limit("10 per minute", deduct_when=admitted)
+@admission.limit('delete')
+@profiler.profile('delete')
 def delete_pages():
     """PDFからページを削除するエンドポイント"""
     upload_path = None
@@ -320,74 +385,71 @@ def delete_pages():
         file.save(upload_path)
         app.logger.info(f"ファイル保存: {upload_path}")
         
-        # PDF読み込み
-        with open(upload_path, 'rb') as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            total_pages = len(reader.pages)
-            app.logger.info(f"総ページ数: {total_pages}")
-            
-            if total_pages > app.config['MAX_PAGES_PER_PDF']:
-                return jsonify({'success': False, 'error': f'ページ数が{app.config["MAX_PAGES_PER_PDF"]}を超えています'})
-            
-            # 削除対象ページの検証
-            invalid_pages = [p for p in pages_to_delete if p < 1 or p > total_pages]
-            if invalid_pages:
-                app.logger.error(f"無効なページ番号: {invalid_pages}")
-                return jsonify({'success': False, 'error': f'無効なページ番号: {invalid_pages}'})
-            
-            # すべてのページを削除しようとしていないかチェック
-            if len(pages_to_delete) >= total_pages:
-                return jsonify({'success': False, 'error': 'すべてのページを削除することはできません'})
-            
-            # 残すページのリストを作成
-            pages_to_keep = [i for i in range(1, total_pages + 1) if i not in pages_to_delete]
-            
-            if not pages_to_keep:
-                return jsonify({'success': False, 'error': '削除後にページが残りません'})
-            
-            app.logger.info(f"残すページ: {pages_to_keep}")
-            
-            # 新しいPDFを作成
-            writer = PyPDF2.PdfWriter()
-            for page_num in pages_to_keep:
-                writer.add_page(reader.pages[page_num - 1])
-            
-            app.logger.info(f"残りページ数: {len(pages_to_keep)}")
-            
-            # 出力ファイルを保存
-            base_name = os.path.splitext(filename)[0]
-            output_filename = f"{unique_id}_{base_name}_deleted.pdf"
-            output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            app.logger.info(f"出力ファイル保存: {output_path}")
-            
-            # ファイルが正常に作成されたことを確認
-            if not os.path.exists(output_path):
-                raise Exception("出力ファイルの作成に失敗しました")
-            
-            file_size = os.path.getsize(output_path)
-            if file_size == 0:
-                raise Exception("出力ファイルが空です")
-            
-            app.logger.info(f"出力ファイルサイズ: {file_size} bytes")
-            
-            # ダウンロードURL（_externalをTrueにして絶対URLを生成）
-            download_url = url_for('download_file', filename=output_filename, _external=True)
-            app.logger.info(f"生成されたダウンロードURL: {download_url}")
-            
-            return jsonify({
-                'success': True,
-                'message': f'{len(pages_to_delete)}ページを削除しました',
-                'filename': output_filename,
-                'display_name': f'{base_name}_deleted.pdf',
-                'deleted_pages': len(pages_to_delete),
-                'remaining_pages': len(pages_to_keep),
-                'download_url': download_url,
-                'file_size': file_size
-            })
+        base_name = os.path.splitext(filename)[0]
+        output_filename = f"{unique_id}_{base_name}_deleted.pdf"
+        
+        engine = pdf_engine('delete')
+        cache_key = result_cache.make_key('delete', [upload_path], {
+            'pages': sorted(pages_to_delete),
+            'engine': engine.name
+        })
+        cached = result_cache.get(cache_key)
+        if cached and not result_cache.restore(
+                cache_key, {'result.pdf': os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)}):
+            cached = None
+        
+        if cached:
+            total_pages = cached['total_pages']
+            pages_to_keep = cached['pages_to_keep']
+            app.logger.info("キャッシュ済みの結果を使用")
+        else:
+            # ページを削除して出力ファイルを保存
+            try:
+                total_pages, pages_to_keep = pdfcutter_core.delete_pages(
+                    upload_path,
+                    os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename),
+                    pages_to_delete,
+                    engine=engine,
+                    max_pages=app.config['MAX_PAGES_PER_PDF']
+                )
+            except pdfcutter_core.PdfOperationError as e:
+                app.logger.error(f"ページ指定エラー: {str(e)}")
+                return jsonify({'success': False, 'error': str(e)})
+            
+            result_cache.store(
+                cache_key,
+                {'result.pdf': os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)},
+                {'total_pages': total_pages, 'pages_to_keep': pages_to_keep}
+            )
+        
+        output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
+        app.logger.info(f"総ページ数: {total_pages}, 残りページ数: {len(pages_to_keep)}")
+        app.logger.info(f"出力ファイル保存: {output_path}")
+        
+        # ファイルが正常に作成されたことを確認
+        if not os.path.exists(output_path):
+            raise Exception("出力ファイルの作成に失敗しました")
+        
+        file_size = os.path.getsize(output_path)
+        if file_size == 0:
+            raise Exception("出力ファイルが空です")
+        
+        app.logger.info(f"出力ファイルサイズ: {file_size} bytes")
+        
+        # ダウンロードURL（_externalをTrueにして絶対URLを生成）
+        download_url = url_for('download_file', filename=output_filename, _external=True)
+        app.logger.info(f"生成されたダウンロードURL: {download_url}")
+        
+        return jsonify({
+            'success': True,
+            'message': f'{len(pages_to_delete)}ページを削除しました',
+            'filename': output_filename,
+            'display_name': f'{base_name}_deleted.pdf',
+            'deleted_pages': len(pages_to_delete),
+            'remaining_pages': len(pages_to_keep),
+            'download_url': download_url,
+            'file_size': file_size
+        })
     
     except Exception as e:
         app.logger.error(f"ページ削除エラー: {str(e)}")
@@ -413,7 +475,9 @@ def delete_pages():
                 app.logger.error(f"一時ファイル削除エラー: {str(e)}")
 
 @app.route('/extract-pages', methods=['POST'])
-@limiter.limit("10 per minute")
+@limiter.limit("10 per minute", deduct_when=admitted)
+@admission.limit('extract')
+@profiler.profile('extract')
 def extract_pages():
     """PDFからページを抽出するエンドポイント"""
     upload_path = None
@@ -456,59 +520,63 @@ def extract_pages():
         file.save(upload_path)
         app.logger.info(f"ファイル保存: {upload_path}")
         
-        # PDF読み込み
-        with open(upload_path, 'rb') as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            total_pages = len(reader.pages)
-            app.logger.info(f"総ページ数: {total_pages}")
-            
-            if total_pages > app.config['MAX_PAGES_PER_PDF']:
-                return jsonify({'success': False, 'error': f'ページ数が{app.config["MAX_PAGES_PER_PDF"]}を超えています'})
-            
-            # 抽出対象ページの検証
-            invalid_pages = [p for p in pages_to_extract if p < 1 or p > total_pages]
-            if invalid_pages:
-                app.logger.error(f"無効なページ番号: {invalid_pages}")
-                return jsonify({'success': False, 'error': f'無効なページ番号: {invalid_pages}'})
-            
-            app.logger.info(f"抽出ページ数: {len(pages_to_extract)}")
-            
-            # 新しいPDFを作成
-            writer = PyPDF2.PdfWriter()
-            for page_num in pages_to_extract:
-                writer.add_page(reader.pages[page_num - 1])
-            
-            # 出力ファイルを保存
-            base_name = os.path.splitext(filename)[0]
-            output_filename = f"{unique_id}_{base_name}_extracted.pdf"
-            output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            app.logger.info(f"出力ファイル保存: {output_path}")
-            
-            if not os.path.exists(output_path):
-                raise Exception("出力ファイルの作成に失敗しました")
-            
-            file_size = os.path.getsize(output_path)
-            if file_size == 0:
-                raise Exception("出力ファイルが空です")
-            
-            app.logger.info(f"出力ファイルサイズ: {file_size} bytes")
-            
-            download_url = url_for('download_file', filename=output_filename, _external=True)
-            app.logger.info(f"生成されたダウンロードURL: {download_url}")
-            
-            return jsonify({
-                'success': True,
-                'message': f'{len(pages_to_extract)}ページを抽出しました',
-                'filename': output_filename,
-                'display_name': f'{base_name}_extracted.pdf',
-                'extracted_pages': len(pages_to_extract),
-                'download_url': download_url,
-                'file_size': file_size
-            })
+        base_name = os.path.splitext(filename)[0]
+        output_filename = f"{unique_id}_{base_name}_extracted.pdf"
+        
+        engine = pdf_engine('extract')
+        compression = requested_compression()
+        cache_key = result_cache.make_key('extract', [upload_path], {
+            'pages': pages_to_extract,
+            'engine': engine.name,
+            'compress': compression
+        })
+        
+        if (result_cache.get(cache_key) and result_cache.restore(
+                cache_key, {'result.pdf': os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)})):
+            app.logger.info("キャッシュ済みの結果を使用")
+        else:
+            # ページを抽出して出力ファイルを保存
+            try:
+                pdfcutter_core.extract_pages(
+                    upload_path,
+                    os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename),
+                    pages_to_extract,
+                    engine=engine,
+                    max_pages=app.config['MAX_PAGES_PER_PDF']
+                )
+                if compression:
+                    compress_output(os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename), compression)
+            except pdfcutter_core.PdfOperationError as e:
+                app.logger.error(f"ページ指定エラー: {str(e)}")
+                return jsonify({'success': False, 'error': str(e)})
+            
+            result_cache.store(cache_key, {'result.pdf': os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)})
+        
+        output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
+        app.logger.info(f"抽出ページ数: {len(pages_to_extract)}")
+        app.logger.info(f"出力ファイル保存: {output_path}")
+        
+        if not os.path.exists(output_path):
+            raise Exception("出力ファイルの作成に失敗しました")
+        
+        file_size = os.path.getsize(output_path)
+        if file_size == 0:
+            raise Exception("出力ファイルが空です")
+        
+        app.logger.info(f"出力ファイルサイズ: {file_size} bytes")
+        
+        download_url = url_for('download_file', filename=output_filename, _external=True)
+        app.logger.info(f"生成されたダウンロードURL: {download_url}")
+        
+        return jsonify({
+            'success': True,
+            'message': f'{len(pages_to_extract)}ページを抽出しました',
+            'filename': output_filename,
+            'display_name': f'{base_name}_extracted.pdf',
+            'extracted_pages': len(pages_to_extract),
+            'download_url': download_url,
+            'file_size': file_size
+        })
     
     except Exception as e:
         app.logger.error(f"ページ抽出エラー: {str(e)}")
@@ -531,8 +599,89 @@ def extract_pages():
             except Exception as e:
                 app.logger.error(f"一時ファイル削除エラー: {str(e)}")
 
+@app.route('/compress', methods=['POST'])
+@limiter.limit("10 per minute", deduct_when=admitted)
+@admission.limit('compress')
+@profiler.profile('compress')
+def compress_pdf():
+    """スキャンPDFなどの埋め込み画像を縮小・再圧縮してファイルサイズを減らす"""
+    upload_path = None
+    
+    try:
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'ファイルが選択されていません'})
+        
+        file = request.files['file']
+        if file.filename == '' or not allowed_file(file.filename):
+            return jsonify({'success': False, 'error': 'PDFファイルを選択してください'})
+        
+        # ファイルを保存
+        filename = secure_filename(file.filename)
+        unique_id = str(uuid.uuid4())
+        upload_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_id}_{filename}")
+        file.save(upload_path)
+        original_size = os.path.getsize(upload_path)
+        
+        base_name = os.path.splitext(filename)[0]
+        output_filename = f"{unique_id}_{base_name}_compressed.pdf"
+        output_path = os.path.join(app.config['DOWNLOAD_FOLDER'], output_filename)
+        
+        options = compression_options()
+        cache_key = result_cache.make_key('compress', [upload_path], options)
+        
+        cached = result_cache.get(cache_key)
+        if cached and not result_cache.restore(cache_key, {'result.pdf': output_path}):
+            cached = None
+        
+        if cached:
+            images_replaced = cached['images_replaced']
+        else:
+            try:
+                stats = pdfcutter_core.compress_pdf(
+                    upload_path, output_path,
+                    max_workers=app.config['COMPRESS_MAX_WORKERS'],
+                    max_pages=app.config['MAX_PAGES_PER_PDF'],
+                    **options
+                )
+            except pdfcutter_core.PdfOperationError as e:
+                return jsonify({'success': False, 'error': str(e)})
+            
+            images_replaced = stats['replaced']
+            app.logger.info(f"画像圧縮: {stats}")
+            result_cache.store(cache_key, {'result.pdf': output_path}, {'images_replaced': images_replaced})
+        
+        file_size = os.path.getsize(output_path)
+        
+        if images_replaced == 0:
+            message = '圧縮できる画像が見つかりませんでした'
+        else:
+            reduction = max(0, round((1 - file_size / original_size) * 100)) if original_size else 0
+            message = f'{images_replaced}個の画像を圧縮しました（{reduction}%削減）'
+        
+        return jsonify({
+            'success': True,
+            'message': message,
+            'filename': output_filename,
+            'display_name': f'{base_name}_compressed.pdf',
+            'download_url': url_for('download_file', filename=output_filename, _external=True),
+            'original_size': original_size,
+            'file_size': file_size,
+            'images_replaced': images_replaced
+        })
+    
+    except Exception as e:
+        app.logger.error(f"画像圧縮エラー: {str(e)}")
+        app.logger.error(traceback.format_exc())
+        return jsonify({'success': False, 'error': 'PDFの圧縮中にエラーが発生しました'})
+    
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+
 @app.route('/get_pdf_info', methods=['POST'])
-@limiter.limit("20 per minute")
+@limiter.limit("20 per minute", deduct_when=admitted)
+@admission.limit('info')
+@profiler.profile('info')
 def get_pdf_info():
     """PDFの基本情報を取得"""
     try:
@@ -551,21 +700,20 @@ def get_pdf_info():
         
         try:
             # PDF情報を読み取り
-            with open(temp_path, 'rb') as pdf_file:
-                reader = PyPDF2.PdfReader(pdf_file)
-                total_pages = len(reader.pages)
-                
-                if total_pages > app.config['MAX_PAGES_PER_PDF']:
-                    return jsonify({
-                        'success': False, 
-                        'error': f'ページ数が{app.config["MAX_PAGES_PER_PDF"]}を超えています'
-                    })
-                
-                return jsonify({
-                    'success': True,
-                    'total_pages': total_pages,
-                    'filename': filename
-                })
+            total_pages = pdfcutter_core.get_page_count(
+                temp_path,
+                engine=pdf_engine('info'),
+                max_pages=app.config['MAX_PAGES_PER_PDF']
+            )
+            
+            return jsonify({
+                'success': True,
+                'total_pages': total_pages,
+                'filename': filename
+            })
+        
+        except pdfcutter_core.PdfOperationError as e:
+            return jsonify({'success': False, 'error': str(e)})
                 
         finally:
             # 一時ファイルを削除
@@ -635,6 +783,8 @@ def download_file(filename):
         return jsonify({'error': f'ダウンロード中にエラーが発生しました: {str(e)}'}), 500
 
 @app.route('/reorder', methods=['POST'])
+@admission.limit('reorder')
+@profiler.profile('reorder')
 def reorder_pdf():
     input_path = None
     output_path = None
@@ -671,29 +821,24 @@ def reorder_pdf():
         # ファイルを保存
         file.save(input_path)
         
-        # PDFを読み込んで並び替え
-        reader = PyPDF2.PdfReader(input_path)
-        writer = PyPDF2.PdfWriter()
-        
-        total_pages = len(reader.pages)
-        
-        # ページ順序の検証
-        if not page_order or max(page_order) > total_pages or min(page_order) < 1:
-            raise ValueError(f"無効なページ番号が含まれています。1-{total_pages}の範囲で指定してください。")
-        
-        if len(page_order) != total_pages:
-            raise ValueError(f"ページ数が一致しません。{total_pages}ページ必要ですが、{len(page_order)}ページが指定されました。")
-        
-        # 指定された順序でページを追加
-        for page_num in page_order:
-            if 1 <= page_num <= total_pages:
-                writer.add_page(reader.pages[page_num - 1])
-            else:
-                raise ValueError(f"無効なページ番号: {page_num}")
+        engine = pdf_engine('reorder')
+        cache_key = result_cache.make_key('reorder', [input_path], {
+            'order': page_order,
+            'engine': engine.name
+        })
+        cached = result_cache.get(cache_key)
+        if cached and not result_cache.restore(cache_key, {'result.pdf': output_path}):
+            cached = None
         
-        # 並び替えたPDFを保存
-        with open(output_path, 'wb') as output_file:
-            writer.write(output_file)
+        if cached:
+            total_pages = cached['total_pages']
+        else:
+            # PDFを読み込んで並び替え（検証エラーは PdfOperationError として下で処理）
+            total_pages = pdfcutter_core.reorder_pages(
+                input_path, output_path, page_order,
+                engine=engine
+            )
+            result_cache.store(cache_key, {'result.pdf': output_path}, {'total_pages': total_pages})
         
         # 元ファイルを削除
         if os.path.exists(input_path):
@@ -748,6 +893,40 @@ def debug_files():
             'upload_folder': upload_folder
         })
 
+@app.route('/cache/stats')
+def cache_stats():
+    """結果キャッシュのヒット・ミス数と使用量"""
+    return jsonify(result_cache.stats())
+
+@app.route('/admin/profiles')
+def list_profiles():
+    """保存済みプロファイルの一覧（管理者用）"""
+    if not profiler.authorized():
+        return jsonify({'error': 'Not allowed'}), 403
+    return jsonify({'profiles': profiler.list()})
+
+@app.route('/admin/profiles/<profile_id>')
+def get_profile(profile_id):
+    """プロファイルの関数別集計を返す。?format=prof なら pstats ファイルをダウンロード（管理者用）"""
+    if not profiler.authorized():
+        return jsonify({'error': 'Not allowed'}), 403
+    
+    path = profiler.path(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    if request.args.get('format') == 'prof':
+        return send_file(path, as_attachment=True, download_name=f"{profile_id}.prof")
+    
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls'):
+        sort = 'cumulative'
+    return jsonify({
+        'id': profile_id,
+        'sort': sort,
+        'stats': profiler.summary(profile_id, sort)
+    })
+
 @app.route('/cleanup')
 def cleanup_files():
     """古いファイルをクリーンアップ（管理者用）"""
@@ -0,0 +1,162 @@
+"""静的アセットのビルド（結合・圧縮・ハッシュ付与）とテンプレート用ヘルパー
+
+使い方:
+    python assets.py          # static/dist/ にビルド
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIRNAME = 'dist'
+DIST_DIR = os.path.join(STATIC_DIR, DIST_DIRNAME)
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# ページごとのバンドル定義（論理名 -> static/ 以下のソースファイル）
+BUNDLES = {
+    'style.css': ['css/style.css'],
+    'merge.js': ['js/common.js', 'js/fileHandler.js', 'js/merge.js'],
+    'split.js': ['js/common.js', 'js/fileHandler.js', 'js/split.js'],
+    'delete.js': ['js/common.js', 'js/fileHandler.js', 'js/delete.js'],
+    'extract.js': ['js/common.js', 'js/fileHandler.js', 'js/extract.js'],
+    'reorder.js': ['js/common.js', 'js/fileHandler.js', 'js/reorder.js'],
+    'compress.js': ['js/common.js', 'js/fileHandler.js', 'js/compress.js'],
+    'contact.js': ['js/common.js', 'js/contact.js'],
+}
+
+# この長さ未満のファイルは圧縮版を作らない
+MIN_COMPRESS_SIZE = 256
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};:,>])\s*')
+
+
+def minify_css(source):
+    """CSSを圧縮する（rcssminが無い場合は簡易処理）"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = _CSS_COMMENT_RE.sub('', source)
+    source = _CSS_SPACE_RE.sub(' ', source)
+    source = _CSS_PUNCT_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """JavaScriptを圧縮する（rjsminが無い場合はそのまま返す）"""
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    return source
+
+
+def _read_source(relpath):
+    with open(os.path.join(STATIC_DIR, relpath), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build_bundle(name, sources):
+    """1つのバンドルを結合・圧縮してハッシュ付きファイル名で書き出す"""
+    if name.endswith('.css'):
+        content = '\n'.join(minify_css(_read_source(src)) for src in sources)
+    else:
+        # スクリプト同士がASIで繋がらないように区切る
+        content = '\n;\n'.join(minify_js(_read_source(src)) for src in sources)
+
+    data = content.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem, ext = os.path.splitext(name)
+    hashed_name = f"{stem}.{digest}{ext}"
+    output_path = os.path.join(DIST_DIR, hashed_name)
+
+    _write(output_path, data)
+    if len(data) >= MIN_COMPRESS_SIZE:
+        # nginx の gzip_static / brotli_static 用に事前圧縮版を作成
+        _write(output_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(output_path + '.br', brotli.compress(data, quality=11))
+
+    return hashed_name
+
+
+def build_assets(bundles=None):
+    """すべてのバンドルをビルドしてマニフェストを書き出す"""
+    bundles = bundles or BUNDLES
+    os.makedirs(DIST_DIR, exist_ok=True)
+
+    manifest = {}
+    for name, sources in bundles.items():
+        manifest[name] = f"{DIST_DIRNAME}/{build_bundle(name, sources)}"
+
+    # 古いビルド成果物を削除
+    keep = {os.path.basename(path) for path in manifest.values()}
+    for filename in os.listdir(DIST_DIR):
+        if filename == 'manifest.json':
+            continue
+        base = filename[:-3] if filename.endswith(('.gz', '.br')) else filename
+        if base not in keep:
+            os.remove(os.path.join(DIST_DIR, filename))
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """マニフェストを読み込む（未ビルドの場合は空の辞書）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_app(app):
+    """テンプレートから asset_urls() を使えるようにする"""
+    from flask import current_app, url_for
+
+    manifest = load_manifest()
+
+    def asset_urls(name):
+        """バンドル名からURLのリストを返す（未ビルドならソースを個別に返す）"""
+        # デバッグ時はソースの変更がすぐ反映されるようにビルド済みを使わない
+        if name in manifest and not current_app.debug:
+            return [url_for('static', filename=manifest[name])]
+        sources = BUNDLES.get(name, [name])
+        return [url_for('static', filename=src) for src in sources]
+
+    app.jinja_env.globals['asset_urls'] = asset_urls
+
+
+if __name__ == '__main__':
+    result = build_assets()
+    for logical, hashed in sorted(result.items()):
+        print(f"{logical} -> {hashed}")
+    if rjsmin is None or rcssmin is None:
+        print("警告: rjsmin/rcssmin が見つからないため簡易圧縮で出力しました", file=sys.stderr)
+    if brotli is None:
+        print("警告: brotli が見つからないため .br ファイルは作成されません", file=sys.stderr)
@@ -0,0 +1,131 @@
+"""PDFエンジンのベンチマーク（分割・結合・ページ削除）
+
+使い方:
+    python bench_engines.py                      # 合成PDFで計測
+    python bench_engines.py --pdf sample.pdf     # 手元のPDFで計測
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import PyPDF2
+from PyPDF2.generic import (
+    DecodedStreamObject, DictionaryObject, NameObject,
+)
+
+from pdf_engine import available_engines, get_engine
+
+
+def make_sample_pdf(path, pages):
+    """共有フォントとテキストを持つ合成PDFを作成"""
+    writer = PyPDF2.PdfWriter()
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    })
+    font_ref = writer._add_object(font)
+
+    for page_num in range(1, pages + 1):
+        page = PyPDF2.PageObject.create_blank_page(width=595, height=842)
+        lines = [f"BT /F1 12 Tf 72 {800 - i * 14} Td (Page {page_num} line {i}) Tj ET"
+                 for i in range(50)]
+        content = DecodedStreamObject()
+        content.set_data('\n'.join(lines).encode('ascii'))
+        page[NameObject('/Contents')] = writer._add_object(content)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font_ref}),
+        })
+        writer.add_page(page)
+
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def bench_split(engine, path, workdir):
+    doc = engine.open(path)
+    try:
+        for page_num in range(1, engine.page_count(doc) + 1):
+            part = engine.select_pages(doc, [page_num])
+            engine.write(part, os.path.join(workdir, f"split_{page_num}.pdf"))
+            engine.close(part)
+    finally:
+        engine.close(doc)
+
+
+def bench_merge(engine, path, workdir, copies=5):
+    docs = [engine.open(path) for _ in range(copies)]
+    try:
+        merged = engine.merge(docs)
+        engine.write(merged, os.path.join(workdir, 'merged.pdf'))
+        engine.close(merged)
+    finally:
+        for doc in docs:
+            engine.close(doc)
+
+
+def bench_delete(engine, path, workdir):
+    doc = engine.open(path)
+    try:
+        # 偶数ページを削除
+        keep = [p for p in range(1, engine.page_count(doc) + 1) if p % 2]
+        result = engine.select_pages(doc, keep)
+        engine.write(result, os.path.join(workdir, 'deleted.pdf'))
+        engine.close(result)
+    finally:
+        engine.close(doc)
+
+
+BENCHMARKS = {
+    'split': bench_split,
+    'merge': bench_merge,
+    'delete': bench_delete,
+}
+
+
+def run(path, engines, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for op, func in BENCHMARKS.items():
+            for name in engines:
+                engine = get_engine(name)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    func(engine, path, workdir)
+                    timings.append(time.perf_counter() - start)
+                results[(op, name)] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDFエンジンのベンチマーク')
+    parser.add_argument('--pdf', help='計測に使うPDF（省略時は合成PDF）')
+    parser.add_argument('--pages', type=int, default=100, help='合成PDFのページ数')
+    parser.add_argument('--repeat', type=int, default=5, help='各計測の繰り返し回数')
+    parser.add_argument('--engines', nargs='*', default=available_engines())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as sample_dir:
+        path = args.pdf
+        if not path:
+            path = os.path.join(sample_dir, 'sample.pdf')
+            make_sample_pdf(path, args.pages)
+
+        size = os.path.getsize(path)
+        print(f"入力: {path} ({size} bytes), エンジン: {', '.join(args.engines)}")
+        results = run(path, args.engines, args.repeat)
+
+    print(f"{'操作':<8}{'エンジン':<10}{'中央値(ms)':>12}")
+    for op in BENCHMARKS:
+        timings = {name: results[(op, name)] for name in args.engines}
+        winner = min(timings, key=timings.get)
+        for name, seconds in timings.items():
+            mark = ' *' if name == winner else ''
+            print(f"{op:<8}{name:<10}{seconds * 1000:>12.1f}{mark}")
+
+
+if __name__ == '__main__':
+    main()
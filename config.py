@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,11 +10,52 @@ class Config:
     
     # 絶対パスに修正
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-    UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
-    DOWNLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'downloads')
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(BASE_DIR, 'static', 'uploads')
+    DOWNLOAD_FOLDER = os.environ.get('DOWNLOAD_FOLDER') or os.path.join(BASE_DIR, 'static', 'downloads')
     
+    # Flask-Limiter のレート制限（負荷試験などで無効にする場合は false）
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+
     MAX_FILES_PER_REQUEST = 10
     MAX_PAGES_PER_PDF = 100
 
+    # PDF処理エンジン（pypdf2 / pikepdf）。操作ごとに PDF_ENGINE_SPLIT などで上書き可能
+    PDF_ENGINE = os.environ.get('PDF_ENGINE', 'pypdf2')
+    PDF_ENGINES = {
+        'info': os.environ.get('PDF_ENGINE_INFO', PDF_ENGINE),
+        'split': os.environ.get('PDF_ENGINE_SPLIT', PDF_ENGINE),
+        'merge': os.environ.get('PDF_ENGINE_MERGE', PDF_ENGINE),
+        'delete': os.environ.get('PDF_ENGINE_DELETE', PDF_ENGINE),
+        'extract': os.environ.get('PDF_ENGINE_EXTRACT', PDF_ENGINE),
+        'reorder': os.environ.get('PDF_ENGINE_REORDER', PDF_ENGINE),
+    }
+
+    # アドミッション制御（全ワーカー合計の処理中コストの上限と、超過時の待ち時間）
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MAX_COST = float(os.environ.get('ADMISSION_MAX_COST', 200))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 5))  # 秒
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 5))  # 秒
+    ADMISSION_STATE_DIR = os.environ.get('ADMISSION_STATE_DIR') or os.path.join(tempfile.gettempdir(), 'pdfcutter-admission')
+
+    # 処理結果キャッシュ（入力の内容ハッシュ＋操作＋パラメータで再利用）
+    # 有効にすると処理結果が RESULT_CACHE_TTL の間サーバーに残るため既定では無効。
+    # TTL は利用規約の「最大24時間で確実に削除」に合わせて24時間が上限
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'false').lower() == 'true'
+    RESULT_CACHE_FOLDER = os.environ.get('RESULT_CACHE_FOLDER') or os.path.join(BASE_DIR, 'cache')
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 200 * 1024 * 1024))  # 200MB
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 3600))  # 秒
+
+    # 画像圧縮（スキャンPDF向け）。COMPRESS_MAX_WORKERS=0 ならCPU数に合わせる
+    COMPRESS_TARGET_DPI = int(os.environ.get('COMPRESS_TARGET_DPI', 150))
+    COMPRESS_JPEG_QUALITY = int(os.environ.get('COMPRESS_JPEG_QUALITY', 75))
+    COMPRESS_MAX_WORKERS = int(os.environ.get('COMPRESS_MAX_WORKERS', 0)) or None
+
+    # プロファイリング（署名付きヘッダー X-Profile-Token またはサンプリングで計測）
+    PROFILING_SECRET = os.environ.get('PROFILING_SECRET', '')
+    # サンプリングは PROFILING_SECRET が無いと無効（結果の取得にトークンが要るため）
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))  # 0.01 なら1%
+    PROFILING_FOLDER = os.environ.get('PROFILING_FOLDER') or os.path.join(BASE_DIR, 'profiles')
+    PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', 50))
+
  # Google Analytics設定（★この1行だけ追加）
     GA_MEASUREMENT_ID = os.environ.get('GA_MEASUREMENT_ID', '')
@@ -31,3 +31,67 @@ proc_name = "pdfcutter"
 daemon = False
 user = "ubuntu"
 group = "ubuntu"
+
+
+# --- 起動時のウォームアップとワーカーのメモリ計測 ---------------------------
+# preload_app で読み込んだアプリを親プロセスでウォームアップし、fork 前に
+# gc.freeze() しておく。max_requests でワーカーが入れ替わっても、新しいワーカーは
+# ウォームアップ済みの状態を共有したまま起動する。
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+
+    import warmup
+    from app import app
+
+    timings = warmup.warm_up(app)
+    frozen = warmup.freeze()
+    server.log.info(f"ウォームアップ完了: {timings} freeze={frozen}")
+    server.log.info(f"親プロセスのメモリ: {warmup.format_memory(warmup.memory_usage())}")
+
+
+def pre_fork(server, worker):
+    # ウォームアップ後に親プロセスで作られたオブジェクトも対象外にする
+    if server.cfg.preload_app:
+        import gc
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    import time
+    worker.forked_at = time.perf_counter()
+    worker.first_request_logged = False
+
+
+def post_worker_init(worker):
+    import time
+    import warmup
+
+    boot_ms = (time.perf_counter() - worker.forked_at) * 1000
+    worker.log.info(f"ワーカー{worker.pid} 起動 {boot_ms:.0f}ms {warmup.format_memory(warmup.memory_usage())}")
+
+
+def pre_request(worker, req):
+    import time
+    worker.request_started = time.perf_counter()
+
+
+def post_request(worker, req, environ, resp):
+    if worker.first_request_logged:
+        return
+
+    import time
+    import warmup
+
+    worker.first_request_logged = True
+    latency_ms = (time.perf_counter() - worker.request_started) * 1000
+    worker.log.info(
+        f"ワーカー{worker.pid} 初回リクエスト {req.method} {req.path} {latency_ms:.0f}ms "
+        f"{warmup.format_memory(warmup.memory_usage())}")
+
+
+def worker_exit(server, worker):
+    import warmup
+    server.log.info(
+        f"ワーカー{worker.pid} 終了 requests={worker.nr} {warmup.format_memory(warmup.memory_usage(worker.pid))}")
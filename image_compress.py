@@ -0,0 +1,321 @@
+"""スキャンPDF向けの画像ダウンサンプリング・再圧縮
+
+埋め込み画像をデコードし、目標DPIまで縮小してから再エンコードして差し替える。
+カラー・グレースケールは JPEG、白黒2値は CCITT G4（作れない場合は Flate）で保存する。
+
+- 画像は表示先のページ全体に広がっているとみなしてDPIを見積もる。実際にはそれより
+  小さく配置されていることが多いので、結果のDPIは目標値以上になる。
+- 同じ画像（同じオブジェクト、またはデータと画像辞書が同じもの）は何ページで使われていても
+  1回だけ処理する。
+- デコード・縮小・エンコードはスレッドプールで並列に行う（Pillow は処理中に GIL を解放する）。
+  元の文書の pikepdf オブジェクトはメインスレッドだけで操作し、ワーカーには生データと
+  画像辞書を Python の値にしたものを渡す。ワーカーはそれを自分専用の Pdf 上で組み立て直して
+  デコードする。同時にデコードする画像はワーカー数までに抑える。
+
+pikepdf と Pillow が必要。
+"""
+import hashlib
+import io
+import os
+import zlib
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import pikepdf
+    from pikepdf import Name
+    from PIL import Image
+except ImportError:
+    pikepdf = None
+    Image = None
+
+DEFAULT_DPI = 150
+DEFAULT_JPEG_QUALITY = 75
+
+# 目標サイズとの差がこの割合未満なら縮小せず再エンコードだけ行う
+RESIZE_TOLERANCE = 0.9
+# これより小さい画像は処理しない（アイコンなど）
+MIN_IMAGE_PIXELS = 64 * 64
+
+# 画像の見え方を決める辞書のエントリ（重複判定とワーカーでの組み立て直しに使う）
+IMAGE_KEYS = ('/Width', '/Height', '/BitsPerComponent', '/ColorSpace', '/Decode',
+              '/Filter', '/DecodeParms')
+
+# 画像辞書から参照されるストリーム（パレット、ICCプロファイルなど）。data はデコード済み
+_StreamData = namedtuple('_StreamData', 'params data')
+
+
+def available():
+    return pikepdf is not None and Image is not None
+
+
+def _iter_images(resources, seen_forms):
+    """リソース辞書から画像 XObject を再帰的に列挙する（フォーム XObject の中も含む）"""
+    xobjects = resources.get('/XObject') if resources is not None else None
+    if xobjects is None:
+        return
+    for _, xobj in xobjects.items():
+        if not isinstance(xobj, pikepdf.Stream):
+            continue
+        subtype = xobj.get('/Subtype')
+        if subtype == Name.Image:
+            yield xobj
+        elif subtype == Name.Form and xobj.objgen not in seen_forms:
+            seen_forms.add(xobj.objgen)
+            yield from _iter_images(xobj.get('/Resources'), seen_forms)
+
+
+def _page_long_side_inches(page):
+    box = [float(v) for v in page.mediabox]
+    width = abs(box[2] - box[0])
+    height = abs(box[3] - box[1])
+    user_unit = float(page.obj.get('/UserUnit', 1))
+    return max(width, height) * user_unit / 72
+
+
+def _one_bit(image):
+    return int(image.get('/BitsPerComponent', 8)) == 1 or image.get('/Filter') in (
+        Name.CCITTFaxDecode, Name.JBIG2Decode)
+
+
+def _is_gray(image):
+    colorspace = image.get('/ColorSpace')
+    if isinstance(colorspace, pikepdf.Array) and len(colorspace) > 0:
+        colorspace = colorspace[0]  # [/CalGray <<...>>]
+    return colorspace is None or colorspace in (Name.DeviceGray, Name.CalGray)
+
+
+def _is_bilevel(image):
+    """白黒2値として G4 で保存し直せる画像か"""
+    return _one_bit(image) and _is_gray(image)
+
+
+def _skip(image):
+    """差し替えると見た目が変わる可能性のある画像は対象外にする"""
+    if image.get('/ImageMask', False):
+        return True
+    if isinstance(image.get('/Mask'), pikepdf.Array):  # カラーキーマスク
+        return True
+    if '/Decode' in image and not isinstance(image.get('/ColorSpace'), pikepdf.Array):
+        return True
+    # 2色パレット（[/Indexed /DeviceRGB 1 <...>]）などの1bit画像は白黒にすると色が変わる
+    if _one_bit(image) and not _is_gray(image):
+        return True
+    return int(image.Width) * int(image.Height) < MIN_IMAGE_PIXELS
+
+
+def _plain(obj):
+    """pikepdf のオブジェクトをスレッド間で受け渡せる Python の値にする
+
+    名前は '/' 始まりの str、文字列は bytes、配列は tuple、辞書はキー順の dict になる。
+    """
+    if isinstance(obj, pikepdf.Stream):
+        params = {key: _plain(value) for key, value in sorted(obj.items())
+                  if key not in ('/Length', '/Filter', '/DecodeParms')}
+        return _StreamData(params, obj.read_bytes())
+    if isinstance(obj, pikepdf.Name):
+        return str(obj)
+    if isinstance(obj, pikepdf.String):
+        return bytes(obj)
+    if isinstance(obj, pikepdf.Array):
+        return tuple(_plain(value) for value in obj)
+    if isinstance(obj, pikepdf.Dictionary):
+        return {key: _plain(value) for key, value in sorted(obj.items())}
+    if obj is None or isinstance(obj, (bool, int)):
+        return obj
+    return float(obj)
+
+
+def _image_params(image):
+    return {key: _plain(image[key]) for key in IMAGE_KEYS if key in image}
+
+
+def _pdf_object(pdf, value):
+    """_plain() で変換した値を pdf 上の pikepdf オブジェクトに戻す"""
+    if isinstance(value, _StreamData):
+        stream = pikepdf.Stream(pdf, value.data)
+        for key, item in value.params.items():
+            stream[key] = _pdf_object(pdf, item)
+        return stream
+    if isinstance(value, str):
+        return Name(value)
+    if isinstance(value, bytes):
+        return pikepdf.String(value)
+    if isinstance(value, tuple):
+        return pikepdf.Array([_pdf_object(pdf, item) for item in value])
+    if isinstance(value, dict):
+        return pikepdf.Dictionary({key: _pdf_object(pdf, item) for key, item in value.items()})
+    return value
+
+
+def _decode(raw, params):
+    """生データと画像辞書から PIL 画像を作る（ワーカー専用の Pdf 上で組み立てる）"""
+    with pikepdf.new() as pdf:
+        stream = pikepdf.Stream(pdf, raw)
+        stream.Type = Name.XObject
+        stream.Subtype = Name.Image
+        for key, value in params.items():
+            stream[key] = _pdf_object(pdf, value)
+        image = pikepdf.PdfImage(stream).as_pil_image()
+        image.load()
+        return image
+
+
+def _target_size(width, height, long_side_inches, target_dpi):
+    target_long = target_dpi * long_side_inches
+    scale = target_long / max(width, height)
+    if scale >= RESIZE_TOLERANCE:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _encode_g4(image):
+    """2値画像を CCITT G4 で圧縮したデータを返す（1ストリップで作れない場合は None）"""
+    buffer = io.BytesIO()
+    # RowsPerStrip を画像の高さにして1ストリップにまとめる
+    image.save(buffer, format='TIFF', compression='group4', tiffinfo={278: image.height})
+    buffer.seek(0)
+    with Image.open(buffer) as tiff:
+        offsets = tiff.tag_v2.get(273)
+        counts = tiff.tag_v2.get(279)
+    if not offsets or len(offsets) != 1:
+        return None
+    return buffer.getvalue()[offsets[0]:offsets[0] + counts[0]]
+
+
+def _process(job):
+    """1画像をデコード・縮小・再エンコードする（スレッドプール内で実行）
+
+    戻り値は (data, filter, decode_parms, width, height, colorspace, bits) または None。
+    """
+    raw, params, long_side, bilevel, target_dpi, jpeg_quality = job
+
+    if params.get('/Filter') == '/DCTDecode':
+        # JPEG はデコード時にDCT領域で縮小できる
+        image = Image.open(io.BytesIO(raw))
+        target = _target_size(params['/Width'], params['/Height'], long_side, target_dpi)
+        image.draft(image.mode, target)
+    else:
+        # JBIG2 など Pillow で扱えない形式はここで失敗し、そのまま残る
+        image = _decode(raw, params)
+
+    new_width, new_height = _target_size(image.width, image.height, long_side, target_dpi)
+
+    if bilevel:
+        gray = image.convert('L')
+        if (new_width, new_height) != gray.size:
+            gray = gray.resize((new_width, new_height), Image.LANCZOS)
+        mono = gray.point(lambda v: 255 if v >= 128 else 0).convert('1')
+        encoded = _encode_g4(mono)
+        if encoded is not None:
+            # libtiff の G4 データは黒を 1 として復号されるため BlackIs1 を立てる
+            parms = pikepdf.Dictionary(
+                K=-1, Columns=new_width, Rows=new_height, BlackIs1=True)
+            return encoded, Name.CCITTFaxDecode, parms, new_width, new_height, Name.DeviceGray, 1
+        # PDFの DeviceGray 1bit は 0=黒。Pillow の '1' も 0=黒なのでそのまま詰める
+        data = zlib.compress(mono.tobytes(), 9)
+        return data, Name.FlateDecode, None, new_width, new_height, Name.DeviceGray, 1
+
+    if image.mode in ('CMYK', 'I', 'F'):
+        if image.mode == 'CMYK':
+            return None
+        image = image.convert('L')
+    elif image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+
+    if (new_width, new_height) != image.size:
+        image = image.resize((new_width, new_height), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=jpeg_quality, optimize=True)
+    colorspace = Name.DeviceGray if image.mode == 'L' else Name.DeviceRGB
+    return buffer.getvalue(), Name.DCTDecode, None, new_width, new_height, colorspace, 8
+
+
+def compress_images(pdf, target_dpi=DEFAULT_DPI, jpeg_quality=DEFAULT_JPEG_QUALITY, max_workers=None):
+    """pikepdf.Pdf 内の画像を縮小・再圧縮し、統計情報を返す"""
+    # 画像ごとに、使われているページの長辺（最大値）を集める
+    images = {}
+    long_sides = {}
+    for page in pdf.pages:
+        long_side = _page_long_side_inches(page)
+        for image in _iter_images(page.obj.get('/Resources'), set()):
+            key = image.objgen
+            images[key] = image
+            long_sides[key] = max(long_sides.get(key, 0), long_side)
+
+    stats = {'images': len(images), 'processed': 0, 'replaced': 0, 'bytes_before': 0, 'bytes_after': 0}
+
+    # データと画像辞書が同じ画像は1回だけ処理する（文書内キャッシュ）。
+    # パレットやDecodeが違えば見た目も違うので、生データだけでなく辞書も含めて比べる
+    members = {}
+    params = {}
+    sizes = {}
+    for key, image in images.items():
+        if _skip(image):
+            continue
+        raw = image.read_raw_bytes()
+        image_params = _image_params(image)
+        digest = hashlib.sha256(raw)
+        digest.update(repr(image_params).encode('utf-8'))
+        digest = digest.hexdigest()
+        members.setdefault(digest, []).append(key)
+        params[digest] = image_params
+        sizes[digest] = len(raw)
+
+    def make_job(digest):
+        keys = members[digest]
+        image = images[keys[0]]
+        long_side = max(long_sides[key] for key in keys)
+        return (image.read_raw_bytes(), params[digest], long_side,
+                _is_bilevel(image), target_dpi, jpeg_quality)
+
+    # 生データの読み出しと差し替えはメインスレッドで行い、処理中の画像はワーカー数までに抑える
+    workers = max_workers or os.cpu_count() or 1
+    queue = iter(members)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while True:
+            for digest in queue:
+                running[executor.submit(_safe_process, make_job(digest))] = digest
+                if len(running) >= workers:
+                    break
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                digest = running.pop(future)
+                stats['processed'] += 1
+                _replace([images[key] for key in members[digest]], sizes[digest],
+                         future.result(), stats)
+
+    return stats
+
+
+def _replace(targets, original_size, result, stats):
+    """処理結果の方が小さければ、同じ内容の画像すべてを差し替える"""
+    if result is None or len(result[0]) >= original_size:
+        return
+
+    data, filter_name, parms, width, height, colorspace, bits = result
+    for image in targets:
+        stats['bytes_before'] += original_size
+        stats['bytes_after'] += len(data)
+        stats['replaced'] += 1
+        image.write(data, filter=filter_name, decode_parms=parms)
+        if parms is None and '/DecodeParms' in image:
+            del image['/DecodeParms']
+        image.Width = width
+        image.Height = height
+        image.ColorSpace = colorspace
+        image.BitsPerComponent = bits
+        for stale in ('/Decode', '/SMaskInData'):
+            if stale in image:
+                del image[stale]
+
+
+def _safe_process(job):
+    try:
+        return _process(job)
+    except Exception:
+        return None
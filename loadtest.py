@@ -0,0 +1,669 @@
+"""本番構成（nginx + gunicorn）を手元で再現する負荷試験
+
+gunicorn.conf.py の設定そのままでアプリを起動し（バインド先と実行ユーザーだけ上書き）、
+その前段に nginx（インストールされていなければ同じ振る舞いをする簡易プロキシ）を置いて、
+ページ表示・ページ数取得・結合・大きな分割ZIPのダウンロードを混ぜたトラフィックを流す。
+アップロードは回線速度を絞って送る（遅いクライアントがワーカーを占有するかどうかを見る）。
+
+結果として手順ごとのスループット・レイテンシ（p50/p90/p99）・ステータス別件数、
+gunicorn のワーカータイムアウト・再起動回数、レート制限（429）・アドミッション制御（503）
+による拒否数を表示する。アップロード・ダウンロード・キャッシュ用のディレクトリは試験ごとの
+一時ディレクトリを使う。
+
+使い方:
+    python loadtest.py                                    # 既定の構成で60秒
+    python loadtest.py --clients 20 --duration 120 --mix landing=40,info=30,merge=20,split=10
+    python loadtest.py --workers 4 --worker-class gthread --threads 4
+    python loadtest.py --env RESULT_CACHE_ENABLED=false --env RATELIMIT_ENABLED=false
+    python loadtest.py --target http://localhost          # 起動済みの環境（docker-compose など）に流す
+
+簡易プロキシは nginx の既定値に合わせて、リクエスト本文を受け取り終えてから転送し
+（proxy_request_buffering）、client_max_body_size（1MB）を超える本文は 413 を返し、
+60秒でタイムアウトする（proxy_read_timeout）。gzip_static は再現しない。
+"""
+import argparse
+import http.client
+import json
+import mimetypes
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+DEFAULT_MIX = 'landing=50,info=25,merge=15,split=10'
+NGINX_CLIENT_MAX_BODY_SIZE = 1024 * 1024  # nginx の既定値
+NGINX_PROXY_READ_TIMEOUT = 60
+STARTUP_TIMEOUT = 30
+
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+              'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-length'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_size(value):
+    """'1m' / '512k' / '1048576' をバイト数にする"""
+    value = value.strip().lower()
+    units = {'k': 1024, 'm': 1024 * 1024, 'g': 1024 * 1024 * 1024}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# --- 簡易プロキシ（nginx の代わり） ----------------------------------------
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    upstream = None
+    static_root = None
+    max_body = NGINX_CLIENT_MAX_BODY_SIZE
+    read_timeout = NGINX_PROXY_READ_TIMEOUT
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _static(self):
+        """nginx.conf の /static/dist/ と /static/ の location を再現する"""
+        rel_path = urlsplit(self.path).path[len('/static/'):]
+        path = os.path.realpath(os.path.join(self.static_root, rel_path))
+        if not path.startswith(self.static_root + os.sep) or not os.path.isfile(path):
+            return self._send(404)
+        with open(path, 'rb') as f:
+            body = f.read()
+        if rel_path.startswith('dist/'):
+            cache_control = 'public, immutable, max-age=31536000'
+        else:
+            cache_control = 'public, max-age=3600'
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self._send(200, body, {'Content-Type': content_type, 'Cache-Control': cache_control})
+
+    def _handle(self):
+        if urlsplit(self.path).path.startswith('/static/'):
+            return self._static()
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > self.max_body:
+            self.close_connection = True
+            return self._send(413, b'413 Request Entity Too Large')
+        # 本文を全て受け取ってから転送する（遅いクライアントがワーカーを占有しない）
+        body = self.rfile.read(length) if length else None
+
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_BY_HOP}
+        headers['X-Real-IP'] = self.client_address[0]
+        headers['X-Forwarded-For'] = self.client_address[0]
+        headers['X-Forwarded-Proto'] = 'http'
+
+        conn = http.client.HTTPConnection(*self.upstream, timeout=self.read_timeout)
+        try:
+            conn.request(self.command, self.path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except socket.timeout:
+            return self._send(504, b'504 Gateway Time-out')
+        except (OSError, http.client.HTTPException):
+            return self._send(502, b'502 Bad Gateway')
+        finally:
+            conn.close()
+
+        response_headers = {key: value for key, value in response.getheaders() if key.lower() not in HOP_BY_HOP}
+        self._send(response.status, data, response_headers)
+
+
+def proxy_main(argv):
+    """簡易プロキシを起動する（loadtest.py から別プロセスとして呼ばれる）"""
+    parser = argparse.ArgumentParser(prog='loadtest.py proxy')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--upstream', required=True, help='host:port')
+    parser.add_argument('--client-max-body-size', default='1m')
+    args = parser.parse_args(argv)
+
+    host, port = args.upstream.rsplit(':', 1)
+    ProxyHandler.upstream = (host, int(port))
+    ProxyHandler.static_root = os.path.realpath(os.path.join(BASE_DIR, 'static'))
+    ProxyHandler.max_body = parse_size(args.client_max_body_size)
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), ProxyHandler)
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+
+
+# --- 構成の起動 --------------------------------------------------------------
+
+def nginx_config(port, upstream_port, workdir, client_max_body_size):
+    """nginx/nginx.conf の HTTPS サーバーと同じ location を HTTP で持つ設定"""
+    static_root = os.path.join(BASE_DIR, 'static')
+    return f"""daemon off;
+pid {workdir}/nginx.pid;
+error_log {workdir}/nginx-error.log;
+events {{
+    worker_connections 1024;
+}}
+http {{
+    include {nginx_mime_types()};
+    access_log off;
+    client_body_temp_path {workdir}/client_body;
+    proxy_temp_path {workdir}/proxy;
+    fastcgi_temp_path {workdir}/fastcgi;
+    uwsgi_temp_path {workdir}/uwsgi;
+    scgi_temp_path {workdir}/scgi;
+    client_max_body_size {client_max_body_size};
+
+    upstream app {{
+        server 127.0.0.1:{upstream_port};
+    }}
+
+    server {{
+        listen 127.0.0.1:{port};
+
+        location /static/dist/ {{
+            alias {static_root}/dist/;
+            gzip_static on;
+            expires 1y;
+            add_header Cache-Control "public, immutable";
+        }}
+
+        location /static/ {{
+            alias {static_root}/;
+            expires 1h;
+            add_header Cache-Control "public";
+        }}
+
+        location / {{
+            proxy_pass http://app;
+            proxy_set_header Host $host;
+            proxy_set_header X-Real-IP $remote_addr;
+            proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+            proxy_set_header X-Forwarded-Proto $scheme;
+        }}
+    }}
+}}
+"""
+
+
+def nginx_mime_types():
+    for path in ('/etc/nginx/mime.types', '/usr/local/etc/nginx/mime.types', '/opt/homebrew/etc/nginx/mime.types'):
+        if os.path.exists(path):
+            return path
+    return 'mime.types'
+
+
+def gunicorn_config(workdir, port, args):
+    """gunicorn.conf.py を読み込んだうえで、負荷試験に必要な項目だけ上書きする設定ファイル"""
+    overrides = {
+        'bind': f'127.0.0.1:{port}',
+        'user': None,
+        'group': None,
+        'daemon': False,
+        'pidfile': os.path.join(workdir, 'gunicorn.pid'),
+        'errorlog': os.path.join(workdir, 'gunicorn.log'),
+        'accesslog': None,
+    }
+    for name in ('workers', 'worker_class', 'threads', 'timeout', 'max_requests'):
+        value = getattr(args, name)
+        if value is not None:
+            overrides[name] = value
+
+    lines = [f"exec(compile(open({os.path.join(BASE_DIR, 'gunicorn.conf.py')!r}).read(), 'gunicorn.conf.py', 'exec'))"]
+    lines += [f"{name} = {value!r}" for name, value in overrides.items()]
+    path = os.path.join(workdir, 'gunicorn.loadtest.py')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def wait_until_up(url, process=None):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    parts = urlsplit(url)
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'起動に失敗しました（終了コード {process.returncode}）')
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request('GET', '/robots.txt')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} が {STARTUP_TIMEOUT} 秒以内に起動しませんでした')
+
+
+class Stack:
+    """gunicorn と前段プロキシを起動・停止する"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix='pdfcutter-loadtest-')
+        self.processes = []
+        self.gunicorn_log = os.path.join(self.workdir, 'gunicorn.log')
+        self.proxy_kind = None
+
+    def _spawn(self, command, env=None, log_name=None):
+        log = open(os.path.join(self.workdir, log_name), 'w') if log_name else subprocess.DEVNULL
+        process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append(process)
+        return process
+
+    def start(self):
+        app_port = free_port()
+        proxy_port = free_port()
+
+        env = dict(os.environ)
+        # キャッシュやワーカー間の共有状態は試験ごとに分ける
+        env.setdefault('ADMISSION_STATE_DIR', os.path.join(self.workdir, 'admission'))
+        env.setdefault('RESULT_CACHE_FOLDER', os.path.join(self.workdir, 'cache'))
+        env.setdefault('PROFILING_FOLDER', os.path.join(self.workdir, 'profiles'))
+        env.setdefault('UPLOAD_FOLDER', os.path.join(self.workdir, 'uploads'))
+        env.setdefault('DOWNLOAD_FOLDER', os.path.join(self.workdir, 'downloads'))
+        self.download_folder = env['DOWNLOAD_FOLDER']
+        env['PYTHONPATH'] = BASE_DIR + os.pathsep + env.get('PYTHONPATH', '')
+        for item in self.args.env:
+            key, _, value = item.partition('=')
+            env[key] = value
+
+        config_path = gunicorn_config(self.workdir, app_port, self.args)
+        gunicorn = self._spawn([sys.executable, '-m', 'gunicorn', '-c', config_path, 'app:app'],
+                               env=env, log_name='gunicorn.out')
+        wait_until_up(f'http://127.0.0.1:{app_port}', gunicorn)
+
+        nginx = shutil.which('nginx')
+        if nginx and self.args.proxy in ('auto', 'nginx'):
+            config = os.path.join(self.workdir, 'nginx.conf')
+            with open(config, 'w') as f:
+                f.write(nginx_config(proxy_port, app_port, self.workdir, self.args.client_max_body_size))
+            proxy = self._spawn([nginx, '-p', self.workdir, '-c', config], log_name='nginx.out')
+            self.proxy_kind = 'nginx'
+        elif self.args.proxy == 'nginx':
+            raise RuntimeError('nginx が見つかりません（--proxy python で簡易プロキシを使えます）')
+        else:
+            proxy = self._spawn([sys.executable, os.path.abspath(__file__), 'proxy',
+                                 '--port', str(proxy_port), '--upstream', f'127.0.0.1:{app_port}',
+                                 '--client-max-body-size', self.args.client_max_body_size],
+                                log_name='proxy.out')
+            self.proxy_kind = 'python'
+        target = f'http://127.0.0.1:{proxy_port}'
+        wait_until_up(target, proxy)
+        return target
+
+    def stop(self):
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process in self.processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def gunicorn_events(self):
+        """gunicorn のログからワーカーのタイムアウト・再起動・強制終了を数える"""
+        events = {'worker_timeouts': 0, 'worker_boots': 0, 'worker_kills': 0}
+        # ダウンロード後も削除されずに残った出力ファイル（ディスク使用量の増加の目安）
+        try:
+            events['leftover_downloads'] = len(os.listdir(self.download_folder))
+        except OSError:
+            events['leftover_downloads'] = 0
+        try:
+            with open(self.gunicorn_log, 'r', errors='replace') as f:
+                for line in f:
+                    if 'WORKER TIMEOUT' in line:
+                        events['worker_timeouts'] += 1
+                    elif 'Booting worker' in line:
+                        events['worker_boots'] += 1
+                    elif 'SIGKILL' in line:
+                        events['worker_kills'] += 1
+        except OSError:
+            pass
+        return events
+
+    def cleanup(self):
+        if self.args.keep_logs:
+            print(f"ログ: {self.workdir}")
+        else:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# --- クライアント -------------------------------------------------------------
+
+def multipart(fields, files):
+    """multipart/form-data の本文と Content-Type を作る"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, data in files:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/pdf\r\n\r\n'.encode() + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Client:
+    def __init__(self, target, upload_speeds, timeout, recorder):
+        parts = urlsplit(target)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.upload_speeds = upload_speeds
+        self.timeout = timeout
+        self.recorder = recorder
+
+    def request(self, step, method, path, body=None, content_type=None):
+        """1リクエストを送って記録し、(ステータス, ヘッダー, 本文) を返す（失敗時は None）"""
+        upload_bps = random.choice(self.upload_speeds) * 1024 if body and self.upload_speeds else None
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.putrequest(method, path)
+            if body is not None:
+                conn.putheader('Content-Type', content_type)
+                conn.putheader('Content-Length', str(len(body)))
+            conn.endheaders()
+            if body is not None:
+                self._send_body(conn, body, upload_bps, start)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.recorder.record(step, None, time.perf_counter() - start, 0, error=type(e).__name__)
+            return None
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - start
+        app_error = False
+        if response.getheader('Content-Type', '').startswith('application/json') and response.status == 200:
+            try:
+                app_error = json.loads(data).get('success') is False
+            except ValueError:
+                app_error = True
+        self.recorder.record(step, response.status, elapsed, len(data), app_error=app_error)
+        return response.status, dict(response.getheaders()), data
+
+    def _send_body(self, conn, body, upload_bps, start):
+        """upload_bps が指定されていればその速度まで絞って送る"""
+        chunk_size = 16 * 1024
+        sent = 0
+        while sent < len(body):
+            conn.send(body[sent:sent + chunk_size])
+            sent += chunk_size
+            if upload_bps:
+                delay = start + sent / upload_bps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+# --- シナリオ -------------------------------------------------------------------
+
+STATIC_RE = re.compile(r'(?:src|href)="(/static/[^"]+\.(?:js|css))"')
+
+
+def scenario_landing(client, inputs):
+    """トップページと、そこから読み込まれるCSS・JSの取得"""
+    result = client.request('landing', 'GET', random.choice(('/', '/split', '/extract')))
+    if result and result[0] == 200:
+        for path in sorted(set(STATIC_RE.findall(result[2].decode('utf-8', 'replace')))):
+            client.request('static', 'GET', path)
+
+
+def scenario_info(client, inputs):
+    body, content_type = multipart([], [('file', 'sample.pdf', inputs['small'])])
+    client.request('info', 'POST', '/get_pdf_info', body, content_type)
+
+
+def scenario_merge(client, inputs):
+    files = [('files[]', f'part{i}.pdf', inputs[name]) for i, name in enumerate(('small', 'medium', 'small'))]
+    body, content_type = multipart([], files)
+    result = client.request('merge', 'POST', '/merge', body, content_type)
+    _download(client, result, 'download_url', 'merge_download')
+
+
+def scenario_split(client, inputs):
+    """全ページ分割して結果のZIPをダウンロードする"""
+    body, content_type = multipart([('split_type', 'all')], [('file', 'large.pdf', inputs['large'])])
+    result = client.request('split', 'POST', '/split', body, content_type)
+    _download(client, result, 'zip_url', 'split_download')
+
+
+def _download(client, result, key, step):
+    if not result or result[0] != 200:
+        return
+    try:
+        url = json.loads(result[2]).get(key)
+    except ValueError:
+        return
+    if url:
+        client.request(step, 'GET', urlsplit(url).path)
+
+
+SCENARIOS = {
+    'landing': scenario_landing,
+    'info': scenario_info,
+    'merge': scenario_merge,
+    'split': scenario_split,
+}
+
+
+def parse_mix(spec):
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'不明なシナリオ: {name}（{", ".join(SCENARIOS)}）')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def make_inputs(workdir, args):
+    """負荷試験で送るPDFを作る"""
+    from bench_engines import make_sample_pdf
+
+    inputs = {}
+    for name, pages in (('small', args.small_pages), ('medium', args.medium_pages), ('large', args.large_pages)):
+        path = os.path.join(workdir, f'{name}.pdf')
+        make_sample_pdf(path, pages)
+        with open(path, 'rb') as f:
+            inputs[name] = f.read()
+    return inputs
+
+
+# --- 集計 -------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def record(self, step, status, elapsed, size, app_error=False, error=None):
+        with self.lock:
+            self.samples.append({'step': step, 'status': status, 'elapsed': elapsed,
+                                 'bytes': size, 'app_error': app_error, 'error': error})
+
+    def summary(self, elapsed):
+        steps = {}
+        for sample in self.samples:
+            steps.setdefault(sample['step'], []).append(sample)
+        steps['TOTAL'] = list(self.samples)
+
+        summary = {}
+        for step, samples in steps.items():
+            latencies = [s['elapsed'] for s in samples if s['status'] is not None]
+            statuses = {}
+            for s in samples:
+                key = str(s['status']) if s['status'] is not None else (s['error'] or 'error')
+                statuses[key] = statuses.get(key, 0) + 1
+            ok = sum(1 for s in samples if s['status'] == 200 and not s['app_error'])
+            summary[step] = {
+                'requests': len(samples),
+                'ok': ok,
+                'throughput': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+                'max_ms': round(max(latencies, default=0) * 1000, 1),
+                'mb': round(sum(s['bytes'] for s in samples) / (1024 * 1024), 2),
+                'app_errors': sum(1 for s in samples if s['app_error']),
+                'statuses': statuses,
+            }
+        return summary
+
+
+def print_report(summary, events, elapsed, args, proxy_kind):
+    total = summary.get('TOTAL', {})
+    statuses = total.get('statuses', {})
+
+    print(f"\n構成: workers={args.workers or 'conf'} worker_class={args.worker_class or 'conf'} "
+          f"proxy={proxy_kind or 'external'} clients={args.clients} 時間={elapsed:.1f}秒")
+    print(f"{'手順':<16}{'件数':>7}{'成功':>7}{'req/s':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'MB':>8}  ステータス")
+    for step, row in sorted(summary.items(), key=lambda item: (item[0] == 'TOTAL', item[0])):
+        statuses_text = ' '.join(f"{k}:{v}" for k, v in sorted(row['statuses'].items()))
+        print(f"{step:<16}{row['requests']:>7}{row['ok']:>7}{row['throughput']:>8.1f}"
+              f"{row['p50_ms']:>9.0f}{row['p90_ms']:>9.0f}{row['p99_ms']:>9.0f}{row['max_ms']:>9.0f}"
+              f"{row['mb']:>8.1f}  {statuses_text}")
+
+    print(f"\nレート制限による拒否 (429): {statuses.get('429', 0)}")
+    print(f"アドミッション制御による拒否 (503): {statuses.get('503', 0)}")
+    print(f"本文サイズ超過 (413): {statuses.get('413', 0)}")
+    print(f"プロキシのエラー (502/504): {statuses.get('502', 0) + statuses.get('504', 0)}")
+    print(f"アプリのエラー応答 (success=false): {total.get('app_errors', 0)}")
+    if events is not None:
+        print(f"ワーカータイムアウト: {events['worker_timeouts']}  強制終了: {events['worker_kills']}  "
+              f"ワーカー起動回数: {events['worker_boots']}")
+        print(f"ダウンロード後も残った出力ファイル: {events['leftover_downloads']}")
+
+
+# --- 実行 -------------------------------------------------------------------------
+
+def run_load(target, inputs, args):
+    mix = args.mix
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = Client(target, args.upload_kbps, args.request_timeout, recorder)
+        while time.monotonic() < deadline:
+            SCENARIOS[rng.choices(names, weights)[0]](client, inputs)
+            if args.think:
+                time.sleep(rng.uniform(0, 2 * args.think))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(args.seed + i,), daemon=True) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='nginx + gunicorn 構成での負荷試験')
+    parser.add_argument('--target', help='起動済みの環境のURL（指定時は gunicorn・プロキシを起動しない）')
+    parser.add_argument('--clients', type=int, default=10, help='同時クライアント数')
+    parser.add_argument('--duration', type=float, default=60, help='試験時間（秒）')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'シナリオの比率（既定: {DEFAULT_MIX}）')
+    parser.add_argument('--upload-kbps', type=lambda v: [float(x) for x in v.split(',') if x],
+                        default=[128, 512, 2048],
+                        help='アップロード速度 KB/s（カンマ区切りでリクエストごとに無作為に選ぶ。0 なら絞らない）')
+    parser.add_argument('--think', type=float, default=0.5, help='シナリオ間の平均待ち時間（秒）')
+    parser.add_argument('--request-timeout', type=float, default=120, help='クライアント側のタイムアウト（秒）')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--small-pages', type=int, default=3)
+    parser.add_argument('--medium-pages', type=int, default=10)
+    parser.add_argument('--large-pages', type=int, default=80)
+    # gunicorn.conf.py の上書き（比較用）
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--worker-class')
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--timeout', type=int)
+    parser.add_argument('--max-requests', type=int)
+    parser.add_argument('--env', action='append', default=[], help='アプリに渡す環境変数 KEY=VALUE（複数指定可）')
+    parser.add_argument('--proxy', choices=('auto', 'nginx', 'python'), default='auto',
+                        help='前段プロキシ（auto: nginx があれば nginx、無ければ簡易プロキシ）')
+    parser.add_argument('--client-max-body-size', default='1m', help='前段プロキシの本文サイズ上限（nginx の既定は 1m）')
+    parser.add_argument('--keep-logs', action='store_true', help='gunicorn・プロキシのログを残す')
+    parser.add_argument('--json', help='集計結果をJSONで保存するパス')
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'proxy':
+        return proxy_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    args.upload_kbps = [speed for speed in args.upload_kbps if speed > 0]
+
+    stack = None if args.target else Stack(args)
+    workdir = stack.workdir if stack else tempfile.mkdtemp(prefix='pdfcutter-loadtest-')
+    try:
+        inputs = make_inputs(workdir, args)
+        target = args.target or stack.start()
+        print(f"対象: {target}  シナリオ: {args.mix}  アップロード速度: {args.upload_kbps or '無制限'} KB/s")
+
+        recorder, elapsed = run_load(target, inputs, args)
+        summary = recorder.summary(elapsed)
+        events = stack.gunicorn_events() if stack else None
+        print_report(summary, events, elapsed, args, stack.proxy_kind if stack else None)
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'elapsed': elapsed, 'steps': summary, 'gunicorn': events,
+                           'options': {k: v for k, v in vars(args).items() if k != 'json'}},
+                          f, ensure_ascii=False, indent=2)
+    finally:
+        if stack:
+            stack.stop()
+            stack.cleanup()
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""PDF処理エンジンの抽象化
+
+各エンドポイントはこのモジュール経由でPDFを扱う。エンジンは操作ごとに
+Config.PDF_ENGINES で切り替えられる（例: 分割だけ pikepdf を使う）。
+
+ページ番号はすべて1始まり。
+"""
+import logging
+
+import PyPDF2
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENGINE = 'pypdf2'
+
+OPERATIONS = ('info', 'split', 'merge', 'delete', 'extract', 'reorder')
+
+# サイズ見積もりで1ファイルあたりに加算するバイト数（カタログ・ページツリー・trailer など）
+FILE_OVERHEAD = 1024
+# サイズ見積もりで1オブジェクトあたりに加算するバイト数（"N 0 obj"・xref 行など）
+OBJECT_OVERHEAD = 40
+# 辞書・配列の1要素あたりの概算バイト数
+ENTRY_SIZE = 16
+# ページ間の共有判定でたどらないキー（ページツリー全体に戻ってしまうため）。
+# 注釈の /P やリンクの /Dest から別ページに出る分は、/Type /Page のオブジェクトで止める
+SKIP_KEYS = ('/Parent',)
+
+
+class PdfEngine:
+    """PDFエンジンの共通インターフェース"""
+
+    name = None
+
+    def open(self, source):
+        """ファイルパスまたはバイナリストリームからドキュメントを開く"""
+        raise NotImplementedError
+
+    def page_count(self, doc):
+        raise NotImplementedError
+
+    def select_pages(self, doc, pages):
+        """指定ページを指定順に並べた新しいドキュメントを作る（抽出・削除・並び替え）"""
+        raise NotImplementedError
+
+    def merge(self, docs):
+        """複数ドキュメントを順に結合した新しいドキュメントを作る"""
+        raise NotImplementedError
+
+    def page_objects(self, doc, page_num):
+        """ページが参照する間接オブジェクトと概算バイト数の辞書を返す
+
+        フォントや画像など複数ページで共有されるオブジェクトは同じキーになるため、
+        出力ファイルのサイズ見積もりで重複を除いて合計できる。
+        """
+        raise NotImplementedError
+
+    def write(self, doc, dest):
+        """ファイルパスまたはバイナリストリームへ書き出す"""
+        raise NotImplementedError
+
+    def close(self, doc):
+        """ドキュメントが持つリソースを解放する"""
+
+
+class PyPDF2Engine(PdfEngine):
+    name = 'pypdf2'
+
+    def open(self, source):
+        # パスを渡すと PyPDF2 が内容をメモリに読み込むため、元ファイルはすぐ閉じられる
+        return PyPDF2.PdfReader(source)
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def select_pages(self, doc, pages):
+        writer = PyPDF2.PdfWriter()
+        for page_num in pages:
+            writer.add_page(doc.pages[page_num - 1])
+        return writer
+
+    def merge(self, docs):
+        writer = PyPDF2.PdfWriter()
+        for doc in docs:
+            for page in doc.pages:
+                writer.add_page(page)
+        return writer
+
+    def page_objects(self, doc, page_num):
+        page = doc.pages[page_num - 1]
+        ref = page.indirect_reference
+        key = (ref.idnum, ref.generation) if ref is not None else ('page', page_num)
+        objects = {}
+        self._collect(page, key, objects)
+        return objects
+
+    def _collect(self, obj, key, objects):
+        objects[key] = OBJECT_OVERHEAD + self._own_size(obj)
+        stack = [obj]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, DictionaryObject):
+                children = [v for k, v in current.items() if k not in SKIP_KEYS]
+            elif isinstance(current, ArrayObject):
+                children = list(current)
+            else:
+                continue
+            for child in children:
+                if isinstance(child, IndirectObject):
+                    child_key = (child.idnum, child.generation)
+                    if child_key in objects:
+                        continue
+                    child = child.get_object()
+                    if isinstance(child, DictionaryObject) and child.get('/Type') == '/Page':
+                        continue
+                    objects[child_key] = OBJECT_OVERHEAD + self._own_size(child)
+                stack.append(child)
+
+    def _own_size(self, obj):
+        size = 0
+        if isinstance(obj, (DictionaryObject, ArrayObject)):
+            size += ENTRY_SIZE * len(obj)
+        data = getattr(obj, '_data', None)
+        if data:
+            size += len(data)
+        return size
+
+    def write(self, doc, dest):
+        if isinstance(dest, str):
+            with open(dest, 'wb') as output_file:
+                doc.write(output_file)
+        else:
+            doc.write(dest)
+
+
+class PikePdfEngine(PdfEngine):
+    """libqpdf ベースのエンジン（pikepdf がインストールされている場合のみ）"""
+
+    name = 'pikepdf'
+
+    def open(self, source):
+        return pikepdf.open(source)
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def select_pages(self, doc, pages):
+        output = pikepdf.Pdf.new()
+        for page_num in pages:
+            output.pages.append(doc.pages[page_num - 1])
+        return output
+
+    def merge(self, docs):
+        output = pikepdf.Pdf.new()
+        for doc in docs:
+            output.pages.extend(doc.pages)
+        return output
+
+    def page_objects(self, doc, page_num):
+        page = doc.pages[page_num - 1].obj
+        objects = {page.objgen: OBJECT_OVERHEAD + self._own_size(page)}
+        stack = [page]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, pikepdf.Dictionary) or isinstance(current, pikepdf.Stream):
+                children = [v for k, v in current.items() if k not in SKIP_KEYS]
+            elif isinstance(current, pikepdf.Array):
+                children = list(current)
+            else:
+                continue
+            for child in children:
+                if not isinstance(child, pikepdf.Object):
+                    continue
+                if child.is_indirect:
+                    if child.objgen in objects:
+                        continue
+                    if isinstance(child, pikepdf.Dictionary) and child.get('/Type') == pikepdf.Name.Page:
+                        continue
+                    objects[child.objgen] = OBJECT_OVERHEAD + self._own_size(child)
+                stack.append(child)
+        return objects
+
+    def _own_size(self, obj):
+        size = 0
+        if isinstance(obj, pikepdf.Stream):
+            size += len(obj.read_raw_bytes()) + ENTRY_SIZE * len(obj.keys())
+        elif isinstance(obj, pikepdf.Dictionary):
+            size += ENTRY_SIZE * len(obj.keys())
+        elif isinstance(obj, pikepdf.Array):
+            size += ENTRY_SIZE * len(obj)
+        return size
+
+    def write(self, doc, dest):
+        doc.save(dest)
+
+    def close(self, doc):
+        doc.close()
+
+
+ENGINES = {
+    PyPDF2Engine.name: PyPDF2Engine,
+}
+
+if pikepdf is not None:
+    ENGINES[PikePdfEngine.name] = PikePdfEngine
+
+_instances = {}
+
+
+def available_engines():
+    return sorted(ENGINES)
+
+
+def get_engine(name=None):
+    """名前からエンジンを取得（未インストールの場合はデフォルトに戻す）"""
+    name = (name or DEFAULT_ENGINE).lower()
+    if name not in ENGINES:
+        logger.warning(f"PDFエンジン '{name}' は利用できません。{DEFAULT_ENGINE} を使用します")
+        name = DEFAULT_ENGINE
+    if name not in _instances:
+        _instances[name] = ENGINES[name]()
+    return _instances[name]
+
+
+def engine_for(operation, config):
+    """Config.PDF_ENGINES から操作に対応するエンジンを取得"""
+    engines = config.get('PDF_ENGINES') or {}
+    return get_engine(engines.get(operation) or config.get('PDF_ENGINE'))
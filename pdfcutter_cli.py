@@ -0,0 +1,237 @@
+"""ディレクトリ内のPDFを一括処理するCLI
+
+入力ディレクトリ以下を再帰的にたどり、各PDFに同じ操作をプロセスプールで並列に適用する。
+出力は入力と同じディレクトリ構成で書き出す。
+
+使い方:
+    python pdfcutter_cli.py info    IN_DIR
+    python pdfcutter_cli.py split   IN_DIR OUT_DIR --mode chunk --chunk-size 10
+    python pdfcutter_cli.py split   IN_DIR OUT_DIR --mode size --max-size-mb 5
+    python pdfcutter_cli.py delete  IN_DIR OUT_DIR --pages 1,3-4
+    python pdfcutter_cli.py extract IN_DIR OUT_DIR --pages 1-10
+    python pdfcutter_cli.py reorder IN_DIR OUT_DIR --order 3,1,2
+    python pdfcutter_cli.py compress IN_DIR OUT_DIR --dpi 150 --jpeg-quality 75
+    python pdfcutter_cli.py merge   IN_DIR OUT_DIR      # ディレクトリごとに1ファイルへ結合
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pdfcutter_core
+import image_compress
+from pdf_engine import available_engines
+
+
+def find_pdfs(root):
+    """root 以下のPDFをディレクトリごとにまとめて返す {相対ディレクトリ: [パス]}"""
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        pdfs = sorted(f for f in filenames if f.lower().endswith('.pdf'))
+        if pdfs:
+            rel_dir = os.path.relpath(dirpath, root)
+            found[rel_dir] = [os.path.join(dirpath, f) for f in pdfs]
+    return found
+
+
+def parse_order(order_spec):
+    """'3,1,2' のような並び順をページ番号のリストにする（重複・順序はそのまま）"""
+    return [int(p) for p in order_spec.replace(' ', '').split(',') if p]
+
+
+def pages_from_spec(page_spec, total_pages):
+    """ページ指定を解析する（範囲外のページを含む場合や有効なページが無い場合はエラー）"""
+    invalid_pages = []
+    for part in page_spec.replace(' ', '').split(','):
+        for number in part.split('-', 1):
+            if number.isdigit() and not 1 <= int(number) <= total_pages:
+                invalid_pages.append(int(number))
+    if invalid_pages:
+        raise pdfcutter_core.PdfOperationError(f'無効なページ番号: {invalid_pages}')
+
+    pages = pdfcutter_core.parse_page_specification(page_spec, total_pages)
+    if not pages:
+        raise pdfcutter_core.PdfOperationError('有効なページが指定されていません')
+    return pages
+
+
+def build_jobs(args):
+    """(入力パスのリスト, 出力先) のジョブを作る"""
+    jobs = []
+    for rel_dir, paths in find_pdfs(args.input).items():
+        out_dir = os.path.join(args.output, rel_dir) if args.output else None
+        if args.operation == 'merge':
+            name = 'merged.pdf' if rel_dir == '.' else f"{os.path.basename(rel_dir)}.pdf"
+            jobs.append((paths, os.path.join(out_dir, name)))
+        else:
+            for path in paths:
+                jobs.append(([path], out_dir))
+    return jobs
+
+
+def run_job(operation, sources, output, options):
+    """1ジョブを実行してページ数・入力バイト数を返す（プロセスプール内で実行）"""
+    engine = options.get('engine')
+    source = sources[0]
+    result = {
+        'sources': sources,
+        'input_bytes': sum(os.path.getsize(p) for p in sources),
+        'pages': 0,
+        'outputs': 0,
+        'output_bytes': 0,
+        'error': None,
+    }
+
+    try:
+        if output:
+            os.makedirs(output if operation != 'merge' else os.path.dirname(output), exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(source))[0]
+
+        if operation == 'info':
+            result['pages'] = pdfcutter_core.get_page_count(source, engine=engine)
+
+        elif operation == 'split':
+            def open_output(group):
+                if len(group) == 1:
+                    return os.path.join(output, f"{base_name}_page_{group[0]}.pdf")
+                return os.path.join(output, f"{base_name}_pages_{group[0]}-{group[-1]}.pdf")
+
+            outputs = pdfcutter_core.split_pdf(
+                source, open_output, options['mode'], engine=engine, **options['split_options'])
+            result['pages'] = sum(len(group) for group, _ in outputs)
+            result['outputs'] = len(outputs)
+
+        elif operation == 'merge':
+            result['pages'] = pdfcutter_core.merge_pdfs(sources, output, engine=engine)
+            result['outputs'] = 1
+
+        elif operation == 'delete':
+            total_pages = pdfcutter_core.get_page_count(source, engine=engine)
+            pages = pages_from_spec(options['pages'], total_pages)
+            pdfcutter_core.delete_pages(
+                source, os.path.join(output, f"{base_name}_deleted.pdf"), pages, engine=engine)
+            result['pages'] = total_pages
+            result['outputs'] = 1
+
+        elif operation == 'extract':
+            total_pages = pdfcutter_core.get_page_count(source, engine=engine)
+            pages = pages_from_spec(options['pages'], total_pages)
+            pdfcutter_core.extract_pages(
+                source, os.path.join(output, f"{base_name}_extracted.pdf"), pages, engine=engine)
+            result['pages'] = total_pages
+            result['outputs'] = 1
+
+        elif operation == 'reorder':
+            result['pages'] = pdfcutter_core.reorder_pages(
+                source, os.path.join(output, f"{base_name}_reordered.pdf"),
+                parse_order(options['order']), engine=engine)
+            result['outputs'] = 1
+
+        elif operation == 'compress':
+            # 画像の縮小・エンコードはプロセスごとに1スレッドで行う（並列化はプロセスプール側）
+            dest = os.path.join(output, f"{base_name}_compressed.pdf")
+            stats = pdfcutter_core.compress_pdf(
+                source, dest, target_dpi=options['dpi'], jpeg_quality=options['jpeg_quality'], max_workers=1)
+            result['pages'] = stats['total_pages']
+            result['output_bytes'] = os.path.getsize(dest)
+            result['outputs'] = 1
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='ディレクトリ内のPDFを一括処理します')
+    parser.add_argument('operation', choices=['info', 'split', 'merge', 'delete', 'extract', 'reorder', 'compress'])
+    parser.add_argument('input', help='入力ディレクトリ')
+    parser.add_argument('output', nargs='?', help='出力ディレクトリ（info 以外は必須）')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='並列プロセス数')
+    parser.add_argument('--engine', choices=available_engines(), help='使用するPDFエンジン')
+    parser.add_argument('--mode', choices=pdfcutter_core.SPLIT_TYPES, default='all', help='分割方法')
+    parser.add_argument('--chunk-size', type=int, default=10, help='--mode chunk の1ファイルあたりのページ数')
+    parser.add_argument('--max-size-mb', type=float, default=5, help='--mode size の1ファイルあたりの最大サイズ')
+    parser.add_argument('--start-page', type=int, help='--mode range の開始ページ')
+    parser.add_argument('--end-page', type=int, help='--mode range の終了ページ')
+    parser.add_argument('--pages', default='', help='ページ指定（例: 1,3,5-7）')
+    parser.add_argument('--order', default='', help='reorder のページ順（例: 3,1,2）')
+    parser.add_argument('--dpi', type=int, default=image_compress.DEFAULT_DPI, help='compress の目標解像度')
+    parser.add_argument('--jpeg-quality', type=int, default=image_compress.DEFAULT_JPEG_QUALITY,
+                        help='compress のJPEG画質（1-95）')
+    parser.add_argument('--quiet', action='store_true', help='ファイルごとの結果を表示しない')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.operation != 'info' and not args.output:
+        print('出力ディレクトリを指定してください', file=sys.stderr)
+        return 2
+    if args.operation in ('delete', 'extract') and not args.pages:
+        print('--pages を指定してください', file=sys.stderr)
+        return 2
+    if args.operation == 'reorder' and not args.order:
+        print('--order を指定してください', file=sys.stderr)
+        return 2
+
+    options = {
+        'engine': args.engine,
+        'mode': args.mode,
+        'split_options': {
+            'start_page': args.start_page,
+            'end_page': args.end_page,
+            'specific_pages': args.pages,
+            'chunk_size': args.chunk_size,
+            'max_bytes': int(args.max_size_mb * 1024 * 1024),
+        },
+        'pages': args.pages,
+        'order': args.order,
+        'dpi': args.dpi,
+        'jpeg_quality': args.jpeg_quality,
+    }
+
+    jobs = build_jobs(args)
+    if not jobs:
+        print('PDFファイルが見つかりません', file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = [executor.submit(run_job, args.operation, sources, output, options)
+                   for sources, output in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"NG  {', '.join(result['sources'])}: {result['error']}", file=sys.stderr)
+            elif not args.quiet:
+                print(f"OK  {', '.join(result['sources'])} ({result['pages']}ページ)")
+    elapsed = time.perf_counter() - start
+
+    succeeded = [r for r in results if not r['error']]
+    files = sum(len(r['sources']) for r in succeeded)
+    pages = sum(r['pages'] for r in succeeded)
+    megabytes = sum(r['input_bytes'] for r in succeeded) / (1024 * 1024)
+    outputs = sum(r['outputs'] for r in succeeded)
+
+    def rate(n):
+        return n / elapsed if elapsed > 0 else 0.0
+
+    print(f"\n処理: {files}ファイル / {pages}ページ / {megabytes:.1f} MB -> 出力 {outputs}ファイル"
+          f"（失敗 {len(results) - len(succeeded)}件）")
+    print(f"時間: {elapsed:.2f}秒 ({args.workers}プロセス)")
+    print(f"スループット: {rate(files):.1f} ファイル/秒, {rate(pages):.1f} ページ/秒, {rate(megabytes):.2f} MB/秒")
+    if args.operation == 'compress' and megabytes:
+        output_megabytes = sum(r['output_bytes'] for r in succeeded) / (1024 * 1024)
+        print(f"圧縮: {megabytes:.1f} MB -> {output_megabytes:.1f} MB（{output_megabytes / megabytes:.0%}）")
+
+    return 1 if len(succeeded) < len(results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
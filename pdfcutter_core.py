@@ -0,0 +1,287 @@
+"""PDF操作のコア処理
+
+Flask のリクエストやファイル配置に依存しない形で分割・結合・削除・抽出・並び替え・
+画像圧縮を提供する。入力はファイルパスまたはバイナリストリーム、出力先も同様。
+Webアプリ（app.py）とバッチ処理用CLI（pdfcutter_cli.py）の両方から使う。
+"""
+import os
+
+import image_compress
+from pdf_engine import FILE_OVERHEAD, PdfEngine, get_engine
+
+SPLIT_TYPES = ('all', 'range', 'specific', 'chunk', 'size')
+
+
+class PdfOperationError(ValueError):
+    """利用者に表示できる入力エラー（ページ指定の誤りなど）"""
+
+
+def _resolve_engine(engine):
+    if isinstance(engine, PdfEngine):
+        return engine
+    return get_engine(engine)
+
+
+def _check_page_limit(total_pages, max_pages, message=None):
+    if max_pages is not None and total_pages > max_pages:
+        raise PdfOperationError(message or f'ページ数が{max_pages}を超えています')
+
+
+def parse_page_specification(page_spec, total_pages):
+    """ページ指定文字列を解析してページ番号のリストを返す"""
+    if not page_spec.strip():
+        return []
+
+    pages = set()
+    parts = page_spec.replace(' ', '').split(',')
+
+    for part in parts:
+        if '-' in part:
+            try:
+                start, end = map(int, part.split('-', 1))
+                start = max(1, min(start, total_pages))
+                end = max(start, min(end, total_pages))
+                pages.update(range(start, end + 1))
+            except ValueError:
+                continue
+        else:
+            try:
+                page = int(part)
+                if 1 <= page <= total_pages:
+                    pages.add(page)
+            except ValueError:
+                continue
+
+    return sorted(list(pages))
+
+
+def chunk_pages(pages, chunk_size):
+    """ページ番号のリストを chunk_size ページずつに区切る"""
+    return [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+
+
+def pack_pages_by_size(engine, reader, pages, max_bytes):
+    """ページを先頭から順に max_bytes 以下のまとまりへ詰める
+
+    フォントや画像など同じパートに既に含まれる共有オブジェクトは二重に数えない。
+    1ページだけで max_bytes を超える場合はそのページ単独のパートになる。
+    """
+    chunks = []
+    current = []
+    current_objects = set()
+    current_size = FILE_OVERHEAD
+
+    for page_num in pages:
+        objects = engine.page_objects(reader, page_num)
+        added = sum(size for key, size in objects.items() if key not in current_objects)
+
+        if current and current_size + added > max_bytes:
+            chunks.append(current)
+            current = []
+            current_objects = set()
+            current_size = FILE_OVERHEAD
+            added = sum(objects.values())
+
+        current.append(page_num)
+        current_objects.update(objects)
+        current_size += added
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def get_page_count(source, engine=None, max_pages=None):
+    """PDFのページ数を返す"""
+    engine = _resolve_engine(engine)
+    reader = engine.open(source)
+    try:
+        total_pages = engine.page_count(reader)
+        _check_page_limit(total_pages, max_pages)
+        return total_pages
+    finally:
+        engine.close(reader)
+
+
+def plan_split(engine, reader, total_pages, split_type='all', start_page=None, end_page=None,
+               specific_pages='', chunk_size=10, max_bytes=5 * 1024 * 1024):
+    """分割方法に応じて出力ファイルごとのページのまとまりを返す"""
+    if split_type == 'all':
+        pages = list(range(1, total_pages + 1))
+    elif split_type == 'range':
+        start_page = max(1, min(start_page or 1, total_pages))
+        end_page = max(start_page, min(end_page or total_pages, total_pages))
+        pages = list(range(start_page, end_page + 1))
+    elif split_type == 'specific':
+        pages = parse_page_specification(specific_pages, total_pages)
+    elif split_type in ('chunk', 'size'):
+        pages = list(range(1, total_pages + 1))
+    else:
+        pages = []
+
+    if not pages:
+        raise PdfOperationError('有効なページが指定されていません')
+
+    if split_type == 'chunk':
+        if chunk_size < 1:
+            raise PdfOperationError('1以上のページ数を指定してください')
+        return chunk_pages(pages, chunk_size)
+    if split_type == 'size':
+        if max_bytes <= 0:
+            raise PdfOperationError('0より大きいサイズを指定してください')
+        return pack_pages_by_size(engine, reader, pages, max_bytes)
+    return [[page_num] for page_num in pages]
+
+
+def split_pdf(source, open_output, split_type='all', engine=None, max_pages=None, **options):
+    """PDFを分割する
+
+    open_output(pages) は出力先（パスまたはストリーム）を返す関数で、
+    ページのまとまりごとに呼ばれる。戻り値は (pages, 出力先) のリスト。
+    options は plan_split() の引数（start_page, chunk_size など）。
+    """
+    engine = _resolve_engine(engine)
+    reader = engine.open(source)
+    try:
+        total_pages = engine.page_count(reader)
+        _check_page_limit(total_pages, max_pages)
+
+        page_groups = plan_split(engine, reader, total_pages, split_type, **options)
+
+        outputs = []
+        for group in page_groups:
+            dest = open_output(group)
+            writer = engine.select_pages(reader, group)
+            try:
+                engine.write(writer, dest)
+            finally:
+                engine.close(writer)
+            outputs.append((group, dest))
+        return outputs
+    finally:
+        engine.close(reader)
+
+
+def merge_pdfs(sources, dest, engine=None, max_pages=None):
+    """複数のPDFを順に結合して dest に書き出し、総ページ数を返す"""
+    engine = _resolve_engine(engine)
+    readers = []
+    total_pages = 0
+
+    try:
+        for source in sources:
+            reader = engine.open(source)
+            readers.append(reader)
+            total_pages += engine.page_count(reader)
+            _check_page_limit(total_pages, max_pages, f'結合後のページ数が{max_pages}を超えています')
+
+        writer = engine.merge(readers)
+        try:
+            engine.write(writer, dest)
+        finally:
+            engine.close(writer)
+        return total_pages
+    finally:
+        for reader in readers:
+            engine.close(reader)
+
+
+def _validate_pages(pages, total_pages):
+    invalid_pages = [p for p in pages if p < 1 or p > total_pages]
+    if invalid_pages:
+        raise PdfOperationError(f'無効なページ番号: {invalid_pages}')
+
+
+def delete_pages(source, dest, pages_to_delete, engine=None, max_pages=None):
+    """指定ページを削除して dest に書き出し、(総ページ数, 残したページ) を返す"""
+    engine = _resolve_engine(engine)
+    pages_to_delete = set(pages_to_delete)
+    reader = engine.open(source)
+    try:
+        total_pages = engine.page_count(reader)
+        _check_page_limit(total_pages, max_pages)
+        _validate_pages(pages_to_delete, total_pages)
+
+        if len(pages_to_delete) >= total_pages:
+            raise PdfOperationError('すべてのページを削除することはできません')
+
+        pages_to_keep = [i for i in range(1, total_pages + 1) if i not in pages_to_delete]
+
+        writer = engine.select_pages(reader, pages_to_keep)
+        try:
+            engine.write(writer, dest)
+        finally:
+            engine.close(writer)
+        return total_pages, pages_to_keep
+    finally:
+        engine.close(reader)
+
+
+def extract_pages(source, dest, pages_to_extract, engine=None, max_pages=None):
+    """指定ページを昇順で抜き出して dest に書き出し、抽出したページを返す"""
+    engine = _resolve_engine(engine)
+    pages_to_extract = sorted(set(pages_to_extract))
+    reader = engine.open(source)
+    try:
+        total_pages = engine.page_count(reader)
+        _check_page_limit(total_pages, max_pages)
+        _validate_pages(pages_to_extract, total_pages)
+
+        writer = engine.select_pages(reader, pages_to_extract)
+        try:
+            engine.write(writer, dest)
+        finally:
+            engine.close(writer)
+        return pages_to_extract
+    finally:
+        engine.close(reader)
+
+
+def reorder_pages(source, dest, page_order, engine=None, max_pages=None):
+    """page_order の順にページを並べ替えて dest に書き出し、総ページ数を返す"""
+    engine = _resolve_engine(engine)
+    reader = engine.open(source)
+    try:
+        total_pages = engine.page_count(reader)
+        _check_page_limit(total_pages, max_pages)
+
+        if not page_order or max(page_order) > total_pages or min(page_order) < 1:
+            raise PdfOperationError(f"無効なページ番号が含まれています。1-{total_pages}の範囲で指定してください。")
+
+        if len(page_order) != total_pages:
+            raise PdfOperationError(f"ページ数が一致しません。{total_pages}ページ必要ですが、{len(page_order)}ページが指定されました。")
+
+        writer = engine.select_pages(reader, page_order)
+        try:
+            engine.write(writer, dest)
+        finally:
+            engine.close(writer)
+        return total_pages
+    finally:
+        engine.close(reader)
+
+
+def compress_pdf(source, dest, target_dpi=image_compress.DEFAULT_DPI,
+                 jpeg_quality=image_compress.DEFAULT_JPEG_QUALITY, max_workers=None, max_pages=None):
+    """埋め込み画像を縮小・再圧縮して dest に書き出し、統計情報を返す
+
+    source と dest に同じパスを指定すると上書きする（結合・抽出結果の後処理用）。
+    画像の処理には pikepdf を直接使うため、PDFエンジンの設定には依存しない。
+    """
+    if not image_compress.available():
+        raise PdfOperationError('画像圧縮機能は利用できません')
+
+    in_place = (isinstance(source, str) and isinstance(dest, str)
+                and os.path.abspath(source) == os.path.abspath(dest))
+    pdf = image_compress.pikepdf.open(source, allow_overwriting_input=in_place)
+    try:
+        total_pages = len(pdf.pages)
+        _check_page_limit(total_pages, max_pages)
+
+        stats = image_compress.compress_images(
+            pdf, target_dpi=target_dpi, jpeg_quality=jpeg_quality, max_workers=max_workers)
+        pdf.save(dest, compress_streams=True, object_stream_mode=image_compress.pikepdf.ObjectStreamMode.generate)
+        stats['total_pages'] = total_pages
+        return stats
+    finally:
+        pdf.close()
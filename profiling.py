@@ -0,0 +1,241 @@
+"""本番リクエストのプロファイリング
+
+遅いが成功したリクエストがどこで時間を使ったかを調べるため、PDF処理のハンドラーを
+cProfile で計測する。計測するのは次のどちらかの場合だけ:
+
+- 署名付きヘッダー X-Profile-Token が付いたリクエスト
+- PROFILING_SAMPLE_RATE の割合で無作為に選ばれたリクエスト（PROFILING_SECRET の設定が必要）
+
+結果はワーカー間で共有するディレクトリに保存し、件数が上限を超えたら古いものから削除する:
+    <PROFILING_FOLDER>/<id>.prof   pstats 形式（snakeviz などでそのまま開ける）
+    <PROFILING_FOLDER>/<id>.json   操作名・処理時間・入力PDFのサイズとページ数（アドミッション制御で読めた分）
+
+トークンは `python profiling.py token` で発行する。管理用の一覧・取得APIも同じトークンで認証する。
+"""
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import time
+import uuid
+from functools import wraps
+
+from flask import g, request
+
+TOKEN_HEADER = 'X-Profile-Token'
+DEFAULT_TOKEN_TTL = 600  # 秒
+
+
+def _signature(secret, expires):
+    return hmac.new(secret.encode('utf-8'), str(expires).encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def make_token(secret, ttl=DEFAULT_TOKEN_TTL):
+    """有効期限付きのトークン "<期限のUNIX時刻>.<署名>" を作る"""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_signature(secret, expires)}"
+
+
+def verify_token(secret, token):
+    if not secret or not token or '.' not in token:
+        return False
+    expires, signature = token.split('.', 1)
+    try:
+        if int(expires) < time.time():
+            return False
+    except ValueError:
+        return False
+    return hmac.compare_digest(signature, _signature(secret, expires))
+
+
+class Profiler:
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.secret = app.config.get('PROFILING_SECRET', '')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.folder = app.config['PROFILING_FOLDER']
+        self.max_files = app.config.get('PROFILING_MAX_FILES', 50)
+        self.top_functions = app.config.get('PROFILING_TOP_FUNCTIONS', 40)
+        if self.sample_rate > 0 and not self.secret:
+            # 一覧・取得APIはトークンで認証するため、シークレットが無いと結果を取り出せない
+            app.logger.warning('PROFILING_SECRET が未設定のため PROFILING_SAMPLE_RATE を無視します')
+            self.sample_rate = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.secret) or self.sample_rate > 0
+
+    def authorized(self):
+        """リクエストに有効なトークンが付いているか"""
+        return verify_token(self.secret, request.headers.get(TOKEN_HEADER))
+
+    def _trigger(self):
+        """計測する理由（'header' / 'sample'）。計測しない場合は None"""
+        if self.authorized():
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    # --- 入力の情報 -------------------------------------------------------
+
+    def _describe_inputs(self):
+        """アップロードされたPDFごとの名前・サイズ・ページ数
+
+        ページ数はアドミッション制御が事前に読んだ値（g.upload_pages）を使い、ここでは
+        PDFを解析し直さない。読んでいない場合（info、アドミッション無効時など）は None。
+        """
+        counted = g.get('upload_pages') or []
+        files = [f for f in request.files.getlist('file') + request.files.getlist('files[]') if f.filename]
+        inputs = []
+        for index, file in enumerate(files):
+            size = None
+            try:
+                file.stream.seek(0, os.SEEK_END)
+                size = file.stream.tell()
+                file.stream.seek(0)
+            except Exception:
+                pass
+            pages = counted[index] if index < len(counted) else None
+            inputs.append({'name': file.filename, 'bytes': size, 'pages': pages})
+        return inputs
+
+    # --- 保存 -------------------------------------------------------------
+
+    def _save(self, profile, meta):
+        os.makedirs(self.folder, exist_ok=True)
+        profile_id = meta['id']
+        prof_path = os.path.join(self.folder, f"{profile_id}.prof")
+        meta_path = os.path.join(self.folder, f"{profile_id}.json")
+
+        profile.dump_stats(prof_path)
+        # メタ情報は一時ファイルに書いてから置き換える（一覧には書き終わったものだけ出す）
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+        self.evict()
+
+    def evict(self):
+        """保存件数が上限を超えた分を古いものから削除する"""
+        metas = sorted(
+            (name for name in os.listdir(self.folder) if name.endswith('.json')),
+            key=lambda name: os.path.getmtime(os.path.join(self.folder, name)),
+        )
+        for name in metas[:max(0, len(metas) - self.max_files)]:
+            profile_id = name[:-len('.json')]
+            for ext in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.folder, profile_id + ext))
+                except OSError:
+                    pass
+
+    # --- 一覧・取得 -------------------------------------------------------
+
+    def list(self):
+        """保存済みプロファイルのメタ情報（新しい順）"""
+        if not os.path.isdir(self.folder):
+            return []
+        metas = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.folder, name), 'r', encoding='utf-8') as f:
+                    metas.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(metas, key=lambda meta: meta.get('created', 0), reverse=True)
+
+    def path(self, profile_id):
+        """pstats ファイルのパス。存在しない・不正なIDの場合は None"""
+        if not profile_id.isalnum():
+            return None
+        path = os.path.join(self.folder, f"{profile_id}.prof")
+        return path if os.path.exists(path) else None
+
+    def summary(self, profile_id, sort='cumulative'):
+        """累積時間の大きい関数の一覧（pstats の表示形式）"""
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(self.top_functions)
+        return stream.getvalue()
+
+    # --- デコレーター -----------------------------------------------------
+
+    def profile(self, operation):
+        """トークン付き・サンプリング対象のリクエストを cProfile で計測するデコレーター"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                trigger = self._trigger() if self.enabled else None
+                if trigger is None:
+                    return view(*args, **kwargs)
+
+                profile = cProfile.Profile()
+                start = time.perf_counter()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # 別のプロファイラーが動作中
+                    return view(*args, **kwargs)
+                try:
+                    response = view(*args, **kwargs)
+                finally:
+                    profile.disable()
+                duration = time.perf_counter() - start
+
+                try:
+                    response = self.app.make_response(response)
+                    inputs = self._describe_inputs()
+                    meta = {
+                        'id': uuid.uuid4().hex,
+                        'operation': operation,
+                        'path': request.path,
+                        'trigger': trigger,
+                        'created': time.time(),
+                        'duration_ms': round(duration * 1000, 1),
+                        'status_code': response.status_code,
+                        'pid': os.getpid(),
+                        'content_length': request.content_length,
+                        'inputs': inputs,
+                        'total_pages': sum(i['pages'] or 0 for i in inputs),
+                        'total_bytes': sum(i['bytes'] or 0 for i in inputs),
+                    }
+                    self._save(profile, meta)
+                    response.headers['X-Profile-Id'] = meta['id']
+                    self.app.logger.info(
+                        f"プロファイル保存: {operation} {meta['duration_ms']}ms id={meta['id']}")
+                except Exception as e:
+                    # 計測結果の保存に失敗しても本来のレスポンスは返す
+                    self.app.logger.error(f"プロファイル保存エラー: {str(e)}")
+                return response
+            return wrapper
+        return decorator
+
+
+if __name__ == '__main__':
+    from config import Config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'token':
+        print(f"使い方: python {sys.argv[0]} token [有効秒数]", file=sys.stderr)
+        sys.exit(2)
+    if not Config.PROFILING_SECRET:
+        print('PROFILING_SECRET が設定されていません', file=sys.stderr)
+        sys.exit(1)
+    ttl = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TOKEN_TTL
+    print(make_token(Config.PROFILING_SECRET, ttl))
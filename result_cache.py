@@ -0,0 +1,276 @@
+"""処理結果のキャッシュ
+
+同じPDFに同じ操作を繰り返した場合（ボタンの二度押しや、ダウンロード後の再実行）に
+PDFの解析・書き出しを省略する。キーは入力ファイルの内容ハッシュ・操作名・正規化した
+パラメータから作る。
+
+キャッシュはディスク上に置き、ワーカー間で共有する:
+    <RESULT_CACHE_FOLDER>/<key>/meta.json   操作結果のメタ情報
+    <RESULT_CACHE_FOLDER>/<key>/<name>      生成したPDF
+合計サイズが上限を超えたら最後に使われた時刻が古いものから削除する。
+
+利用規約で「最大24時間で確実に削除」としているため、保存から RESULT_CACHE_TTL
+（24時間が上限）を過ぎたものは参照の有無にかかわらず起動時と保存のたびに削除する。
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+STATS_FILE = '.stats.json'
+LOCK_FILE = '.lock'
+META_FILE = 'meta.json'
+STAT_KEYS = ('hits', 'misses', 'expired', 'stores', 'evictions')
+
+# 利用規約で約束している最大保持時間（秒）。RESULT_CACHE_TTL はこれを超えられない
+MAX_RETENTION = 24 * 60 * 60
+
+
+def file_digest(path):
+    """ファイル内容の SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+class ResultCache:
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('RESULT_CACHE_ENABLED', True)
+        self.folder = app.config['RESULT_CACHE_FOLDER']
+        self.max_bytes = app.config.get('RESULT_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+        self.ttl = min(app.config.get('RESULT_CACHE_TTL', 3600), MAX_RETENTION)
+        os.makedirs(self.folder, exist_ok=True)
+        self.lock_path = os.path.join(self.folder, LOCK_FILE)
+        self.stats_path = os.path.join(self.folder, STATS_FILE)
+        # 前回の起動時の残り（無効化後に残ったものを含む）を片付ける
+        self.sweep()
+
+    # --- キー ------------------------------------------------------------
+
+    def make_key(self, operation, input_paths, params):
+        """入力の内容ハッシュ・操作名・パラメータからキーを作る
+
+        params は呼び出し側で正規化しておく（削除・抽出ならソート済みページ集合など）。
+        入力の順序は結合結果に影響するため、そのままの順でハッシュする。
+        キャッシュが無効な場合は入力を読まずに None を返す（get / store はミス扱い）。
+        """
+        if not self.enabled:
+            return None
+
+        spec = {
+            'operation': operation,
+            'inputs': [file_digest(path) for path in input_paths],
+            'params': params,
+        }
+        encoded = json.dumps(spec, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    # --- 統計 ------------------------------------------------------------
+
+    def _locked(self):
+        lock_file = open(self.lock_path, 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _unlock(self, lock_file):
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    def _read_stats(self):
+        try:
+            with open(self.stats_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {key: 0 for key in STAT_KEYS}
+
+    def _count(self, **increments):
+        lock_file = self._locked()
+        try:
+            stats = self._read_stats()
+            for key, value in increments.items():
+                stats[key] = stats.get(key, 0) + value
+            with open(self.stats_path, 'w') as f:
+                json.dump(stats, f)
+        finally:
+            self._unlock(lock_file)
+
+    def stats(self):
+        """ヒット・ミス数と現在のキャッシュ使用量"""
+        stats = self._read_stats()
+        entries = self._entries()
+        stats['entries'] = len(entries)
+        stats['bytes'] = sum(size for _, _, size in entries)
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        stats['hit_rate'] = round(stats.get('hits', 0) / lookups, 3) if lookups else 0.0
+        return stats
+
+    # --- 取得・保存 ------------------------------------------------------
+
+    def _entry_path(self, key):
+        return os.path.join(self.folder, key)
+
+    def get(self, key):
+        """キャッシュ済みならメタ情報を返す。無い・期限切れの場合は None"""
+        if not self.enabled or key is None:
+            return None
+
+        entry = self._entry_path(key)
+        try:
+            with open(os.path.join(entry, META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._count(misses=1)
+            return None
+
+        if time.time() - meta.get('created', 0) > self.ttl:
+            shutil.rmtree(entry, ignore_errors=True)
+            self._count(misses=1, expired=1)
+            return None
+
+        # 最終利用時刻を更新（削除順の判定に使う）
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._count(hits=1)
+        return meta
+
+    def restore(self, key, files):
+        """キャッシュ済みのファイル {名前: 配置先} を配置する（同じファイルシステムならハードリンク）
+
+        get() の後に他のワーカーが削除した場合は配置済みの分を消して False を返す。
+        呼び出し側はキャッシュが無かった場合と同じく処理をやり直す。
+        """
+        placed = []
+        try:
+            for name, dest in files.items():
+                src = os.path.join(self._entry_path(key), name)
+                try:
+                    os.link(src, dest)
+                except FileNotFoundError:
+                    # 元のファイルが削除済み（コピーしても同じく失敗する）
+                    raise
+                except OSError:
+                    shutil.copyfile(src, dest)
+                placed.append(dest)
+        except OSError:
+            for dest in placed:
+                try:
+                    os.remove(dest)
+                except OSError:
+                    pass
+            self._count(hits=-1, misses=1)
+            return False
+        return True
+
+    def store(self, key, files, meta=None):
+        """生成したファイル {名前: パス} とメタ情報を保存する"""
+        if not self.enabled or key is None:
+            return
+
+        tmp_entry = os.path.join(self.folder, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_entry)
+        try:
+            for name, path in files.items():
+                try:
+                    os.link(path, os.path.join(tmp_entry, name))
+                except OSError:
+                    shutil.copyfile(path, os.path.join(tmp_entry, name))
+
+            meta = dict(meta or {})
+            meta['created'] = time.time()
+            meta['files'] = sorted(files)
+            with open(os.path.join(tmp_entry, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            if _dir_size(tmp_entry) > self.max_bytes:
+                return
+            try:
+                os.rename(tmp_entry, self._entry_path(key))
+            except OSError:
+                # 同時に同じ結果が保存された場合は先に保存された方を使う
+                return
+            self._count(stores=1)
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self.evict()
+
+    def _created(self, name):
+        """エントリーの保存時刻（メタ情報が読めない場合はディレクトリの変更時刻）"""
+        path = self._entry_path(name)
+        try:
+            with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f).get('created', 0)
+        except (OSError, ValueError):
+            return os.path.getmtime(path)
+
+    def sweep(self):
+        """保存から ttl を過ぎたエントリーを削除する（無効時はすべて削除する）"""
+        now = time.time()
+        expired = 0
+        for name in os.listdir(self.folder):
+            if name in (STATS_FILE, LOCK_FILE):
+                continue
+            try:
+                # 書き込み途中で終了したワーカーの一時ディレクトリも対象にする
+                if self.enabled and now - self._created(name) <= self.ttl:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(self._entry_path(name), ignore_errors=True)
+            if not name.startswith('.'):
+                expired += 1
+        if expired:
+            self._count(expired=expired)
+        return expired
+
+    def _entries(self):
+        """(キー, 最終利用時刻, サイズ) のリスト"""
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                entries.append((name, os.path.getmtime(path), _dir_size(path)))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self):
+        """期限切れのものを削除し、合計サイズが上限以下になるまで古いものから削除する"""
+        self.sweep()
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count(evictions=evicted)
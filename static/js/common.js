@@ -97,6 +97,39 @@ class PDFProcessor {
     }
 }
 
+// サーバー混雑（503）時のエラー。message はそのまま利用者に表示できる
+class ServerBusyError extends Error {}
+
+// 混雑時の自動再試行の回数と、自動で待つ最大秒数
+const BUSY_MAX_RETRIES = 2;
+const BUSY_MAX_WAIT_SECONDS = 30;
+
+// fetch のラッパー。503 の場合は Retry-After の秒数だけ待って再送し、
+// それでも混雑している場合はサーバーのメッセージを持つ ServerBusyError を投げる
+async function fetchWithRetry(url, options = {}) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(url, options);
+        if (response.status !== 503) {
+            return response;
+        }
+
+        let message = 'サーバーが混雑しています。しばらくしてから再度お試しください';
+        try {
+            const data = await response.json();
+            if (data.error) message = data.error;
+        } catch (e) {
+            // JSON 以外（プロキシのエラーページなど）は既定のメッセージを使う
+        }
+
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 5;
+        if (attempt >= BUSY_MAX_RETRIES || retryAfter > BUSY_MAX_WAIT_SECONDS) {
+            throw new ServerBusyError(`${message}（約${retryAfter}秒後に再度お試しください）`);
+        }
+        console.warn(`Server busy, retrying in ${retryAfter}s`);
+        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+    }
+}
+
 // グローバルメニュー制御
 document.addEventListener('DOMContentLoaded', () => {
     const navDropdown = document.querySelector('.nav-dropdown');
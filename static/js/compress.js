@@ -0,0 +1,98 @@
+// PDF圧縮機能
+class PDFCompressor {
+    constructor(processor, fileHandler) {
+        this.processor = processor;
+        this.fileHandler = fileHandler;
+        this.compressBtn = document.getElementById('compressBtn');
+        this.clearBtn = document.getElementById('clearBtn');
+        this.resultSection = document.getElementById('resultSection');
+        this.resultContent = document.getElementById('resultContent');
+        this.jpegQualityInput = document.getElementById('jpegQuality');
+
+        this.initEventListeners();
+    }
+
+    initEventListeners() {
+        if (this.compressBtn) {
+            this.compressBtn.addEventListener('click', () => this.compressPDF());
+        }
+
+        if (this.clearBtn) {
+            this.clearBtn.addEventListener('click', () => this.fileHandler.clearFiles());
+        }
+    }
+
+    async compressPDF() {
+        if (!this.processor.currentPdfFile) {
+            this.processor.showError(this.resultContent, 'PDFファイルを選択してください。');
+            if (this.resultSection) this.resultSection.style.display = 'block';
+            return;
+        }
+
+        const levelElement = document.querySelector('input[name="compressLevel"]:checked');
+        const jpegQuality = this.jpegQualityInput ? parseInt(this.jpegQualityInput.value, 10) : 75;
+
+        if (!jpegQuality || jpegQuality < 30 || jpegQuality > 95) {
+            this.processor.showError(this.resultContent, 'JPEG画質は30〜95の範囲で入力してください。');
+            if (this.resultSection) this.resultSection.style.display = 'block';
+            return;
+        }
+
+        const formData = new FormData();
+        formData.append('file', this.processor.currentPdfFile);
+        formData.append('target_dpi', levelElement ? levelElement.value : '150');
+        formData.append('jpeg_quality', jpegQuality);
+
+        this.processor.showLoading();
+
+        try {
+            const response = await fetchWithRetry('/compress', {
+                method: 'POST',
+                body: formData
+            });
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const data = await response.json();
+            this.processor.hideLoading();
+
+            if (data.success) {
+                this.displayCompressResult(data);
+            } else {
+                this.processor.showError(this.resultContent, data.error || '圧縮に失敗しました。');
+            }
+
+            if (this.resultSection) this.resultSection.style.display = 'block';
+
+        } catch (error) {
+            console.error('Fetch error:', error);
+            this.processor.hideLoading();
+            this.processor.showError(this.resultContent, error instanceof ServerBusyError
+                ? error.message
+                : '処理中にエラーが発生しました: ' + error.message);
+            if (this.resultSection) this.resultSection.style.display = 'block';
+        }
+    }
+
+    displayCompressResult(data) {
+        if (!this.resultContent) return;
+
+        const originalSize = this.processor.formatFileSize(data.original_size);
+        const fileSize = this.processor.formatFileSize(data.file_size);
+
+        this.resultContent.innerHTML = `
+            <div class="result-success">
+                <i class="fas fa-check-circle"></i>
+                <h3>圧縮完了</h3>
+                <p>${data.message}</p>
+                <p>${originalSize} → ${fileSize}</p>
+                <a href="${data.download_url}" class="download-btn" download="${data.display_name}">
+                    <i class="fas fa-download"></i>
+                    圧縮済みPDFをダウンロード
+                </a>
+            </div>
+        `;
+    }
+}
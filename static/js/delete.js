@@ -60,7 +60,7 @@ class PDFDeleter {
             const formData = new FormData();
             formData.append('file', this.currentPdfFile);
 
-            const response = await fetch('/get_pdf_info', {
+            const response = await fetchWithRetry('/get_pdf_info', {
                 method: 'POST',
                 body: formData
             });
@@ -85,7 +85,9 @@ class PDFDeleter {
         } catch (error) {
             console.error('Error loading PDF info:', error);
             if (this.previewSection) {
-                this.processor.showError(this.previewSection, 'PDFの読み込み中にエラーが発生しました');
+                this.processor.showError(this.previewSection, error instanceof ServerBusyError
+                    ? error.message
+                    : 'PDFの読み込み中にエラーが発生しました');
             }
         } finally {
             this.processor.hideLoading();
@@ -208,7 +210,7 @@ class PDFDeleter {
             formData.append('file', this.currentPdfFile);
             formData.append('pages_to_delete', JSON.stringify(Array.from(this.pagesToDelete)));
 
-            const response = await fetch('/delete-pages', {
+            const response = await fetchWithRetry('/delete-pages', {
                 method: 'POST',
                 body: formData
             });
@@ -243,7 +245,9 @@ class PDFDeleter {
         } catch (error) {
             console.error('Error deleting pages:', error);
             if (this.resultSection) {
-                this.processor.showError(this.resultSection, 'ページの削除中にエラーが発生しました');
+                this.processor.showError(this.resultSection, error instanceof ServerBusyError
+                    ? error.message
+                    : 'ページの削除中にエラーが発生しました');
                 this.resultSection.style.display = 'block';
             }
         } finally {
@@ -20,7 +20,7 @@ class PDFExtractProcessor {
         const formData = new FormData();
         formData.append('file', file);
 
-        const response = await fetch('/get_pdf_info', {
+        const response = await fetchWithRetry('/get_pdf_info', {
             method: 'POST',
             body: formData
         });
@@ -32,12 +32,15 @@ class PDFExtractProcessor {
         return await response.json();
     }
 
-    async extractPages(file, pagesToExtract) {
+    async extractPages(file, pagesToExtract, compress = false) {
         const formData = new FormData();
         formData.append('file', file);
         formData.append('pages_to_extract', JSON.stringify(pagesToExtract));
+        if (compress) {
+            formData.append('compress', 'true');
+        }
 
-        const response = await fetch('/extract-pages', {
+        const response = await fetchWithRetry('/extract-pages', {
             method: 'POST',
             body: formData
         });
@@ -71,6 +74,7 @@ class ExtractUI {
         this.selectAllBtn = document.getElementById('selectAllBtn');
         this.deselectAllBtn = document.getElementById('deselectAllBtn');
         this.extractBtn = document.getElementById('extractBtn');
+        this.compressOption = document.getElementById('compressOption');
         this.resultSection = document.getElementById('resultSection');
         this.resultContent = document.getElementById('resultContent');
         this.loading = document.getElementById('loading');
@@ -166,7 +170,7 @@ class ExtractUI {
             }
         } catch (error) {
             console.error('Error:', error);
-            alert('ファイルの処理中にエラーが発生しました');
+            alert(error instanceof ServerBusyError ? error.message : 'ファイルの処理中にエラーが発生しました');
         } finally {
             this.hideLoading();
         }
@@ -279,7 +283,8 @@ class ExtractUI {
             this.showLoading();
 
             const pagesToExtract = Array.from(this.processor.selectedPages).sort((a, b) => a - b);
-            const result = await this.processor.extractPages(this.processor.currentFile, pagesToExtract);
+            const compress = this.compressOption ? this.compressOption.checked : false;
+            const result = await this.processor.extractPages(this.processor.currentFile, pagesToExtract, compress);
 
             if (result.success) {
                 if (this.resultContent) {
@@ -304,7 +309,7 @@ class ExtractUI {
             }
         } catch (error) {
             console.error('Error:', error);
-            alert('抽出処理中にエラーが発生しました');
+            alert(error instanceof ServerBusyError ? error.message : '抽出処理中にエラーが発生しました');
         } finally {
             this.processor.isProcessing = false;
             this.hideLoading();
@@ -45,10 +45,15 @@ class PDFMerger {
             formData.append('files[]', file);
         });
 
+        const compressOption = document.getElementById('compressOption');
+        if (compressOption && compressOption.checked) {
+            formData.append('compress', 'true');
+        }
+
         this.processor.showLoading();
 
         try {
-            const response = await fetch('/merge', {
+            const response = await fetchWithRetry('/merge', {
                 method: 'POST',
                 body: formData
             });
@@ -77,7 +82,9 @@ class PDFMerger {
         } catch (error) {
             console.error('Fetch error:', error);
             this.processor.hideLoading();
-            this.processor.showError(this.resultContent, '処理中にエラーが発生しました: ' + error.message);
+            this.processor.showError(this.resultContent, error instanceof ServerBusyError
+                ? error.message
+                : '処理中にエラーが発生しました: ' + error.message);
             if (this.resultSection) this.resultSection.style.display = 'block';
         }
     }
@@ -187,7 +187,7 @@ class PDFReorder {
             const formData = new FormData();
             formData.append('file', file);
 
-            const response = await fetch('/get_pdf_info', {
+            const response = await fetchWithRetry('/get_pdf_info', {
                 method: 'POST',
                 body: formData
             });
@@ -214,7 +214,9 @@ class PDFReorder {
         } catch (error) {
             console.error('PDF loading error:', error);
             this.processor.hideLoading();
-            this.processor.showError(this.resultContent, 'PDFファイルの読み込みに失敗しました: ' + error.message);
+            this.processor.showError(this.resultContent, error instanceof ServerBusyError
+                ? error.message
+                : 'PDFファイルの読み込みに失敗しました: ' + error.message);
             if (this.resultSection) this.resultSection.style.display = 'block';
         }
     }
@@ -415,7 +417,7 @@ class PDFReorder {
         this.processor.showLoading();
 
         try {
-            const response = await fetch('/reorder', {
+            const response = await fetchWithRetry('/reorder', {
                 method: 'POST',
                 body: formData
             });
@@ -449,7 +451,9 @@ class PDFReorder {
             this.processor.hideLoading();
             
             let errorMessage = '処理中にエラーが発生しました。';
-            if (error.message.includes('405')) {
+            if (error instanceof ServerBusyError) {
+                errorMessage = error.message;
+            } else if (error.message.includes('405')) {
                 errorMessage = 'サーバーがこの機能をサポートしていません。';
             } else if (error.message.includes('404')) {
                 errorMessage = 'サービスが見つかりません。';
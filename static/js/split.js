@@ -12,6 +12,10 @@ class PDFSplitter {
         this.startPageInput = document.getElementById('startPage');
         this.endPageInput = document.getElementById('endPage');
         this.specificPagesInput = document.getElementById('specificPages');
+        this.chunkInputs = document.getElementById('chunkInputs');
+        this.sizeInputs = document.getElementById('sizeInputs');
+        this.chunkSizeInput = document.getElementById('chunkSize');
+        this.maxSizeInput = document.getElementById('maxSizeMb');
         
         this.initEventListeners();
     }
@@ -36,12 +40,18 @@ class PDFSplitter {
         // すべての入力エリアを非表示
         if (this.rangeInputs) this.rangeInputs.style.display = 'none';
         if (this.specificInputs) this.specificInputs.style.display = 'none';
+        if (this.chunkInputs) this.chunkInputs.style.display = 'none';
+        if (this.sizeInputs) this.sizeInputs.style.display = 'none';
 
         // 選択されたタイプに応じて表示
         if (splitType === 'range' && this.rangeInputs) {
             this.rangeInputs.style.display = 'block';
         } else if (splitType === 'specific' && this.specificInputs) {
             this.specificInputs.style.display = 'block';
+        } else if (splitType === 'chunk' && this.chunkInputs) {
+            this.chunkInputs.style.display = 'block';
+        } else if (splitType === 'size' && this.sizeInputs) {
+            this.sizeInputs.style.display = 'block';
         }
     }
 
@@ -89,12 +99,32 @@ class PDFSplitter {
             }
             
             formData.append('specific_pages', specificPages);
+        } else if (splitType === 'chunk') {
+            const chunkSize = this.chunkSizeInput ? parseInt(this.chunkSizeInput.value, 10) : NaN;
+            
+            if (!chunkSize || chunkSize < 1) {
+                this.processor.showError(this.resultContent, '1以上のページ数を入力してください。');
+                if (this.resultSection) this.resultSection.style.display = 'block';
+                return;
+            }
+            
+            formData.append('chunk_size', chunkSize);
+        } else if (splitType === 'size') {
+            const maxSizeMb = this.maxSizeInput ? parseFloat(this.maxSizeInput.value) : NaN;
+            
+            if (!maxSizeMb || maxSizeMb <= 0) {
+                this.processor.showError(this.resultContent, '0より大きいサイズを入力してください。');
+                if (this.resultSection) this.resultSection.style.display = 'block';
+                return;
+            }
+            
+            formData.append('max_size_mb', maxSizeMb);
         }
 
         this.processor.showLoading();
 
         try {
-            const response = await fetch('/split', {
+            const response = await fetchWithRetry('/split', {
                 method: 'POST',
                 body: formData
             });
@@ -118,7 +148,9 @@ class PDFSplitter {
         } catch (error) {
             console.error('Fetch error:', error);
             this.processor.hideLoading();
-            this.processor.showError(this.resultContent, '処理中にエラーが発生しました: ' + error.message);
+            this.processor.showError(this.resultContent, error instanceof ServerBusyError
+                ? error.message
+                : '処理中にエラーが発生しました: ' + error.message);
             if (this.resultSection) this.resultSection.style.display = 'block';
         }
     }
@@ -0,0 +1,130 @@
+"""ワーカー起動前のウォームアップとメモリ使用量の計測
+
+gunicorn は preload_app でアプリを親プロセスに読み込んでから fork するが、
+PDFエンジンや画像処理の初回実行時に読み込まれるモジュール・テンプレートのコンパイル結果は
+各ワーカーが最初のリクエストで個別に作ることになる。max_requests でワーカーが
+入れ替わるたびにこれが繰り返されるため、親プロセスで一度実行しておく。
+
+また fork 後に親から引き継いだオブジェクトの参照カウントやGCヘッダーが書き換わると、
+その領域はコピーオンライトで複製されて共有されなくなる。fork 前に gc.freeze() で
+既存のオブジェクトをGCの対象外にしておく（gunicorn.conf.py の when_ready / pre_fork）。
+"""
+import gc
+import io
+import os
+import time
+
+from PyPDF2 import PdfWriter
+
+import image_compress
+from pdf_engine import available_engines, get_engine
+
+# ページ表示時に読み込まれるテンプレート
+PAGE_TEMPLATES = ('index.html', 'split.html', 'delete.html', 'extract.html', 'reorder.html',
+                  'compress.html', 'contact.html', 'terms.html', 'privacy.html')
+
+
+def _sample_pdf(pages=2):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _warm_engines():
+    """各エンジンで開く・選択・結合・書き出しを一通り実行する"""
+    data = _sample_pdf()
+    for name in available_engines():
+        engine = get_engine(name)
+        docs = [engine.open(io.BytesIO(data)) for _ in range(2)]
+        try:
+            engine.page_count(docs[0])
+            engine.page_objects(docs[0], 1)
+            for writer in (engine.select_pages(docs[0], [2, 1]), engine.merge(docs)):
+                try:
+                    engine.write(writer, io.BytesIO())
+                finally:
+                    engine.close(writer)
+        finally:
+            for doc in docs:
+                engine.close(doc)
+
+
+def _warm_images():
+    """Pillow のプラグインとJPEG・G4エンコーダーを読み込む"""
+    if not image_compress.available():
+        return
+    image = image_compress.Image.new('L', (64, 64), 255)
+    image.save(io.BytesIO(), format='JPEG', quality=image_compress.DEFAULT_JPEG_QUALITY)
+    image_compress._encode_g4(image.convert('1'))
+
+
+def _warm_templates(app):
+    """テンプレートのコンパイルとURLルールの構築を済ませる"""
+    from flask import render_template
+
+    for name in app.jinja_env.list_templates():
+        if name.endswith('.html'):
+            app.jinja_env.get_template(name)
+
+    with app.test_request_context('/'):
+        for name in PAGE_TEMPLATES:
+            try:
+                render_template(name)
+            except Exception as e:
+                app.logger.warning(f"ウォームアップ: {name} の描画に失敗しました: {str(e)}")
+
+
+def warm_up(app):
+    """親プロセスでの事前読み込み。各段階の所要時間（秒）を返す"""
+    timings = {}
+    for name, step in (('engines', _warm_engines),
+                       ('images', _warm_images),
+                       ('templates', lambda: _warm_templates(app))):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            # ウォームアップの失敗で起動を止めない（初回リクエストが遅くなるだけ）
+            app.logger.warning(f"ウォームアップ失敗 ({name}): {str(e)}")
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+def freeze():
+    """現在のオブジェクトをGCの対象外にして fork 後も共有されたままにする"""
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+def memory_usage(pid=None):
+    """プロセスのメモリ使用量（MB）。Linux では共有分・固有分も返す
+
+    rss: 物理メモリ上のサイズ（共有ページも全て含む）
+    pss: 共有ページをプロセス数で按分したサイズ（コンテナ内の合計はこれで見積もる）
+    shared / private: 他プロセスと共有しているページ / このプロセスだけのページ
+    """
+    pid = pid or os.getpid()
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(':')
+                if key in fields and len(parts) >= 2:
+                    usage[fields[key]] = usage.get(fields[key], 0) + int(parts[1]) / 1024
+    except OSError:
+        import resource
+        # smaps_rollup が無い環境では最大RSSだけ返す（Linux は KB、macOS はバイト単位）
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage['rss'] = maxrss / 1024 if os.uname().sysname == 'Linux' else maxrss / (1024 * 1024)
+    return {key: round(value, 1) for key, value in usage.items()}
+
+
+def format_memory(usage):
+    return ' '.join(f"{key}={value}MB" for key, value in usage.items())